@@ -6,11 +6,16 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        "mcp[cli]>=0.4.0",
-        "kubernetes>=29.0.0",
-        "python-dotenv>=1.0.0"
+        "mcp[cli]>=1.3.0",
+        "kubernetes_asyncio>=29.0.0",
+        "aiohttp>=3.8.0",
+        "orjson>=3.8.0",
+        "PyYAML>=6.0",
+        "typing_extensions>=4.6.0",
+        "python-dotenv>=1.0.0",
+        "uvloop>=0.17.0; sys_platform != 'win32'"
     ],
-    python_requires=">=3.7",
+    python_requires=">=3.11",
     author="Enes Erdoğan",
     author_email="enes70442@@gmail.com",
     description="A Kubernetes MCP server for natural language interaction with Kubernetes clusters",
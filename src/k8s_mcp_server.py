@@ -1,43 +1,111 @@
 import asyncio
+import importlib
+import os
+from contextlib import asynccontextmanager
 from mcp.server.fastmcp import FastMCP
 from k8s_tools.k8s_manager import KubernetesManager
-from k8s_tools.deployment_tools import register_deployment_tools
-from k8s_tools.service_tools import register_service_tools
-from k8s_tools.pod_tools import register_pod_tools
-from k8s_tools.job_tools import register_job_tools
-from k8s_tools.cronjob_tools import register_cronjob_tools
-from k8s_tools.ingress_tools import register_ingress_tools
-from k8s_tools.yaml_tools import apply_yaml
-from k8s_tools.helm_tools import register_helm_tools
-from typing import Optional
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop is not available on Windows; the stock asyncio loop is used there
+    uvloop = None
+
+# Tool groups that take the shared manager, registered in this order
+K8S_TOOL_MODULES = (
+    "deployment_tools",
+    "service_tools",
+    "pod_tools",
+    "job_tools",
+    "cronjob_tools",
+    "ingress_tools",
+    "helm_tools"
+)
+
+def _register_function(name: str) -> Callable:
+    """Import a k8s_tools module and return its register function
+    
+    Modules are imported here, when their group is registered, so groups
+    left out of the K8S_MCP_TOOLS allowlist are never imported.
+    """
+    module = importlib.import_module(f"k8s_tools.{name}")
+    return getattr(module, f"register_{name}")
+
+class LazyToolsMCP(FastMCP):
+    """FastMCP server that imports its tool groups on first use
+    
+    Groups are queued at startup and imported and registered when a client
+    first lists or calls tools, so the server is up before any tool module
+    has been loaded.
+    """
+    
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._pending_groups: List[Tuple[str, Tuple[Any, ...]]] = []
+    
+    def add_tool_group(self, name: str, *args: Any) -> None:
+        """Queue a k8s_tools module, whose register function takes args after the server"""
+        self._pending_groups.append((name, args))
+    
+    def _register_pending_groups(self) -> None:
+        while self._pending_groups:
+            name, args = self._pending_groups.pop(0)
+            _register_function(name)(self, *args)
+    
+    async def list_tools(self):
+        self._register_pending_groups()
+        return await super().list_tools()
+    
+    async def call_tool(self, name: str, arguments: dict):
+        self._register_pending_groups()
+        return await super().call_tool(name, arguments)
+
+def _enabled_tool_modules() -> Optional[set]:
+    """Tool modules allowed by K8S_MCP_TOOLS, or None for all of them"""
+    selected = os.environ.get("K8S_MCP_TOOLS")
+    if not selected:
+        return None
+    return {f"{name.strip()}_tools" for name in selected.split(",") if name.strip()}
 
 def main():
-    # Initialize the MCP server
-    mcp = FastMCP("k8s-server")
+    # mcp.run() creates its loop through asyncio, so installing uvloop's
+    # policy first makes every tool coroutine run on uvloop
+    if uvloop is not None:
+        uvloop.install()
     
     # Initialize Kubernetes manager
     k8s_manager = KubernetesManager()
     
-    # Register all Kubernetes tools
-    register_deployment_tools(mcp, k8s_manager)
-    register_service_tools(mcp, k8s_manager)
-    register_pod_tools(mcp, k8s_manager)
-    register_job_tools(mcp, k8s_manager)
-    register_cronjob_tools(mcp, k8s_manager)
-    register_ingress_tools(mcp, k8s_manager)
+    @asynccontextmanager
+    async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+        # The shared async API client has to be created inside the event loop
+        await k8s_manager.setup()
+        try:
+            yield
+        finally:
+            await k8s_manager.aclose()
+    
+    # Initialize the MCP server
+    mcp = LazyToolsMCP("k8s-server", lifespan=lifespan)
     
-    # Register Helm tools
-    register_helm_tools(mcp)
+    # Queue the selected Kubernetes tools; unselected modules are never imported
+    enabled = _enabled_tool_modules()
+    for name in K8S_TOOL_MODULES:
+        if enabled is None or name in enabled:
+            mcp.add_tool_group(name, k8s_manager)
     
     # Register YAML tool
-    @mcp.tool()
-    async def apply_yaml_tool(
-        yaml_content: str,
-        namespace: Optional[str] = None,
-        force: bool = False
-    ) -> str:
-        """Apply YAML content to the Kubernetes cluster"""
-        return await apply_yaml(yaml_content, namespace, force)
+    if enabled is None or "yaml_tools" in enabled:
+        @mcp.tool()
+        async def apply_yaml_tool(
+            yaml_content: str,
+            namespace: Optional[str] = None,
+            force: bool = False
+        ) -> str:
+            """Apply YAML content to the Kubernetes cluster"""
+            from k8s_tools.yaml_tools import apply_yaml
+            return await apply_yaml(k8s_manager, yaml_content, namespace, force)
     
     # Start the server
     mcp.run()
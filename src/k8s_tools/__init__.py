@@ -1,13 +1,19 @@
-from .pod_tools import register_pod_tools
-from .deployment_tools import register_deployment_tools
-from .service_tools import register_service_tools
-from .namespace_tools import register_namespace_tools
-from .cluster_tools import register_cluster_tools
+import importlib
 
-__all__ = [
-    'register_pod_tools',
-    'register_deployment_tools',
-    'register_service_tools',
-    'register_namespace_tools',
-    'register_cluster_tools'
-] 
\ No newline at end of file
+# Tool modules are imported on first attribute access, so importing one
+# submodule (e.g. k8s_tools.k8s_manager) does not load every tool module
+_REGISTER_FUNCTIONS = {
+    'register_pod_tools': '.pod_tools',
+    'register_deployment_tools': '.deployment_tools',
+    'register_service_tools': '.service_tools',
+    'register_namespace_tools': '.namespace_tools',
+    'register_cluster_tools': '.cluster_tools'
+}
+
+__all__ = list(_REGISTER_FUNCTIONS)
+
+def __getattr__(name):
+    module_name = _REGISTER_FUNCTIONS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
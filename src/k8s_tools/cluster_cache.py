@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import random
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from kubernetes_asyncio import client, watch
+from kubernetes_asyncio.client.rest import ApiException
+
+# Seconds between full re-lists that heal events missed by a watch
+RESYNC_PERIOD = 60
+
+# Seconds to wait before retrying after a failed list or watch
+RETRY_DELAY = 5
+
+# Random extra fraction added to each resync period and retry delay, so the
+# caches re-list at different moments instead of all at once
+STAGGER = 0.25
+
+_SELECTOR_SPLIT_RE = re.compile(r",(?![^(]*\))")
+_SET_REQUIREMENT_RE = re.compile(r"^([\w./-]+)\s+(in|notin)\s+\(([\w.,\s-]*)\)$")
+_EQUALITY_REQUIREMENT_RE = re.compile(r"^([\w./-]+)\s*(==|=|!=)\s*([\w.-]*)$")
+_EXISTS_REQUIREMENT_RE = re.compile(r"^(!?)\s*([\w./-]+)$")
+
+ResourceKey = Tuple[Optional[str], str]
+
+def matches_label_selector(selector: Optional[str], labels: Optional[Dict[str, str]]) -> bool:
+    """Check labels against a Kubernetes label selector string
+
+    Supports equality (=, ==, !=), set (in, notin) and existence (key, !key)
+    requirements. Raises ValueError for selectors it cannot parse.
+    """
+    if not selector:
+        return True
+    labels = labels or {}
+
+    for requirement in _SELECTOR_SPLIT_RE.split(selector):
+        requirement = requirement.strip()
+        if not requirement:
+            continue
+
+        match = _SET_REQUIREMENT_RE.match(requirement)
+        if match:
+            key, operator, values = match.groups()
+            value_set = {value.strip() for value in values.split(",")}
+            if (labels.get(key) in value_set) != (operator == "in"):
+                return False
+            continue
+
+        match = _EQUALITY_REQUIREMENT_RE.match(requirement)
+        if match:
+            key, operator, value = match.groups()
+            if (labels.get(key) == value) != (operator != "!="):
+                return False
+            continue
+
+        match = _EXISTS_REQUIREMENT_RE.match(requirement)
+        if match:
+            negated, key = match.groups()
+            if (key in labels) == bool(negated):
+                return False
+            continue
+
+        raise ValueError(f"Unsupported label selector requirement: {requirement}")
+
+    return True
+
+def resource_key(obj: Any) -> ResourceKey:
+    return (obj.metadata.namespace, obj.metadata.name)
+
+def _staggered(seconds: float) -> float:
+    return seconds * (1 + random.uniform(0, STAGGER))
+
+class ResourceCache:
+    """In-memory copy of one resource kind, kept current by list-then-watch
+    
+    The watch starts on the first lookup. If the API server forbids listing
+    the kind, the cache gives up and every lookup falls back to the API.
+    """
+
+    def __init__(self, list_func: Callable, resync_period: int = RESYNC_PERIOD):
+        self._list_func = list_func
+        self._resync_period = resync_period
+        self._items: Dict[ResourceKey, Any] = {}
+        self._ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the cache holds a complete, currently watched snapshot"""
+        return self._ready
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._ready = False
+
+    def get(self, name: str, namespace: Optional[str] = None) -> Optional[Any]:
+        """Return a cached object, or None if it is unknown or the cache is stale"""
+        self.start()
+        if not self._ready:
+            return None
+        return self._items.get((namespace, name))
+
+    def list(
+        self,
+        namespace: Optional[str] = None,
+        label_selector: Optional[str] = None
+    ) -> Optional[List[Any]]:
+        """Return cached objects matching the filters
+
+        Returns None when the cache cannot answer (not yet synced, watch
+        failing, or an unsupported selector) so callers fall back to the API.
+        """
+        self.start()
+        if not self._ready:
+            return None
+        try:
+            return [
+                obj for (obj_namespace, _), obj in self._items.items()
+                if (namespace is None or obj_namespace == namespace)
+                and matches_label_selector(label_selector, obj.metadata.labels)
+            ]
+        except ValueError:
+            return None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                response = await self._list_func()
+                self._items = {resource_key(obj): obj for obj in response.items}
+                self._ready = True
+
+                # The server ends the watch after resync_period seconds, after
+                # which the loop re-lists to heal any missed events
+                async with watch.Watch() as w:
+                    async for event in w.stream(
+                        self._list_func,
+                        resource_version=response.metadata.resource_version,
+                        timeout_seconds=int(_staggered(self._resync_period))
+                    ):
+                        self._apply_event(event)
+            except asyncio.CancelledError:
+                raise
+            except ApiException as e:
+                if e.status == 410:
+                    # Resource version too old, re-list straight away
+                    continue
+                if e.status == 403:
+                    # e.g. namespace-scoped RBAC; retrying won't change that
+                    self._ready = False
+                    logging.warning(
+                        f"Watch for {self._list_func.__name__} is forbidden, serving from the API instead"
+                    )
+                    return
+                self._ready = False
+                logging.warning(f"Watch for {self._list_func.__name__} failed: {e}")
+                await asyncio.sleep(_staggered(RETRY_DELAY))
+            except Exception as e:
+                self._ready = False
+                logging.warning(f"Watch for {self._list_func.__name__} failed: {e}")
+                await asyncio.sleep(_staggered(RETRY_DELAY))
+
+    def _apply_event(self, event: Dict[str, Any]) -> None:
+        obj = event["object"]
+        if event["type"] in ("ADDED", "MODIFIED"):
+            self._items[resource_key(obj)] = obj
+        elif event["type"] == "DELETED":
+            self._items.pop(resource_key(obj), None)
+
+class ClusterStateCache:
+    """Watch-backed caches for the resource kinds served by list queries
+    
+    Each cache starts its own watch when it is first used.
+    """
+
+    def __init__(self, api_client: client.ApiClient, resync_period: int = RESYNC_PERIOD):
+        core_v1 = client.CoreV1Api(api_client)
+        apps_v1 = client.AppsV1Api(api_client)
+        batch_v1 = client.BatchV1Api(api_client)
+
+        self.nodes = ResourceCache(core_v1.list_node, resync_period)
+        self.namespaces = ResourceCache(core_v1.list_namespace, resync_period)
+        self.pods = ResourceCache(core_v1.list_pod_for_all_namespaces, resync_period)
+        self.services = ResourceCache(core_v1.list_service_for_all_namespaces, resync_period)
+        self.statefulsets = ResourceCache(apps_v1.list_stateful_set_for_all_namespaces, resync_period)
+        self.jobs = ResourceCache(batch_v1.list_job_for_all_namespaces, resync_period)
+        self.cronjobs = ResourceCache(batch_v1.list_cron_job_for_all_namespaces, resync_period)
+
+    def _caches(self) -> List[ResourceCache]:
+        return [self.nodes, self.namespaces, self.pods, self.services, self.statefulsets, self.jobs, self.cronjobs]
+
+    async def stop(self) -> None:
+        await asyncio.gather(*(cache.stop() for cache in self._caches()))
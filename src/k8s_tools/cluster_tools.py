@@ -1,20 +1,48 @@
+import asyncio
 from typing import Dict, Any, List, Optional
 from mcp.server.fastmcp import FastMCP, Context
+from kubernetes_asyncio import client
+from kubernetes_asyncio.client.rest import ApiException
+import orjson
+import yaml
 
-from .pod_tools import run_kubectl_command
+from .k8s_manager import KubernetesManager
 
-def register_cluster_tools(mcp: FastMCP):
+# libyaml's emitter when PyYAML was built with it, the pure-Python one otherwise
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+def serialize_response(api_client: client.ApiClient, response: Any, output: str = "json") -> str:
+    """Serialize an API response as JSON or YAML"""
+    data = api_client.sanitize_for_serialization(response)
+    if output == "yaml":
+        return yaml.dump(data, Dumper=_YAML_DUMPER, sort_keys=False)
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+
+def register_cluster_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all cluster-related tools with the MCP server"""
-    
+
     @mcp.tool()
     async def get_cluster_info(
         output: str = "json"
     ) -> str:
         """Get cluster information"""
-        return await run_kubectl_command(
-            "cluster-info",
-            ["-o", output]
-        )
+        try:
+            api_client = k8s_manager.get_api_client()
+            core_v1 = k8s_manager.get_core_api()
+            version = await k8s_manager.call(client.VersionApi(api_client).get_code)
+            services = await k8s_manager.call(
+                core_v1.list_namespaced_service,
+                "kube-system",
+                label_selector="kubernetes.io/cluster-service=true"
+            )
+            info = {
+                "controlPlane": api_client.configuration.host,
+                "version": version,
+                "clusterServices": [service.metadata.name for service in services.items]
+            }
+            return serialize_response(api_client, info, output)
+        except ApiException as e:
+            return f"Error getting cluster info: {e}"
 
     @mcp.tool()
     async def get_nodes(
@@ -22,13 +50,20 @@ def register_cluster_tools(mcp: FastMCP):
         output: str = "json"
     ) -> str:
         """Get cluster nodes with optional filtering"""
-        args = ["nodes"]
-        
-        if label_selector:
-            args.extend(["-l", label_selector])
-        
-        args.extend(["-o", output])
-        return await run_kubectl_command("get", args)
+        try:
+            api_client = k8s_manager.get_api_client()
+            state_cache = k8s_manager.get_state_cache()
+            nodes = state_cache.nodes.list(label_selector=label_selector)
+            if nodes is None:
+                response = await k8s_manager.call(
+                    k8s_manager.get_core_api().list_node,
+                    label_selector=label_selector
+                )
+            else:
+                response = client.V1NodeList(api_version="v1", kind="NodeList", items=nodes)
+            return serialize_response(api_client, response, output)
+        except ApiException as e:
+            return f"Error getting nodes: {e}"
 
     @mcp.tool()
     async def describe_node(
@@ -36,30 +71,42 @@ def register_cluster_tools(mcp: FastMCP):
         output: str = "yaml"
     ) -> str:
         """Describe a specific node"""
-        return await run_kubectl_command(
-            "describe",
-            ["node", node_name, "-o", output]
-        )
+        try:
+            api_client = k8s_manager.get_api_client()
+            response = await k8s_manager.call(k8s_manager.get_core_api().read_node, node_name)
+            return serialize_response(api_client, response, output)
+        except ApiException as e:
+            return f"Error describing node: {e}"
 
     @mcp.tool()
     async def cordon_node(
         node_name: str
     ) -> str:
         """Mark a node as unschedulable"""
-        return await run_kubectl_command(
-            "cordon",
-            [node_name]
-        )
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_core_api().patch_node,
+                node_name,
+                {"spec": {"unschedulable": True}}
+            )
+            return f"Node {node_name} cordoned"
+        except ApiException as e:
+            return f"Error cordoning node: {e}"
 
     @mcp.tool()
     async def uncordon_node(
         node_name: str
     ) -> str:
         """Mark a node as schedulable"""
-        return await run_kubectl_command(
-            "uncordon",
-            [node_name]
-        )
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_core_api().patch_node,
+                node_name,
+                {"spec": {"unschedulable": False}}
+            )
+            return f"Node {node_name} uncordoned"
+        except ApiException as e:
+            return f"Error uncordoning node: {e}"
 
     @mcp.tool()
     async def drain_node(
@@ -69,23 +116,100 @@ def register_cluster_tools(mcp: FastMCP):
         delete_local_data: bool = False
     ) -> str:
         """Drain a node in preparation for maintenance"""
-        args = ["drain", node_name]
-        
-        if force:
-            args.append("--force")
-        if ignore_daemonsets:
-            args.append("--ignore-daemonsets")
-        if delete_local_data:
-            args.append("--delete-local-data")
-            
-        return await run_kubectl_command(*args)
+        try:
+            core_v1 = k8s_manager.get_core_api()
+            pods = await k8s_manager.call(
+                core_v1.list_pod_for_all_namespaces,
+                field_selector=f"spec.nodeName={node_name}"
+            )
+
+            # Decide which pods to evict, mirroring kubectl drain's safety checks
+            to_evict = []
+            errors = []
+            for pod in pods.items:
+                metadata = pod.metadata
+                if metadata.annotations and "kubernetes.io/config.mirror" in metadata.annotations:
+                    continue
+                owners = metadata.owner_references or []
+                if any(owner.kind == "DaemonSet" for owner in owners):
+                    if not ignore_daemonsets:
+                        errors.append(f"{metadata.namespace}/{metadata.name} is managed by a DaemonSet")
+                    continue
+                if not owners and not force:
+                    errors.append(f"{metadata.namespace}/{metadata.name} is not managed by a controller")
+                    continue
+                if any(volume.empty_dir for volume in pod.spec.volumes or []) and not delete_local_data:
+                    errors.append(f"{metadata.namespace}/{metadata.name} uses local storage")
+                    continue
+                to_evict.append(pod)
+
+            if errors:
+                return "Cannot drain node:\n" + "\n".join(f"  - {error}" for error in errors)
+
+            await k8s_manager.call(core_v1.patch_node, node_name, {"spec": {"unschedulable": True}})
+
+            # Evictions run together; one failing must not hide the others
+            results = await asyncio.gather(*(
+                k8s_manager.call(
+                    core_v1.create_namespaced_pod_eviction,
+                    pod.metadata.name,
+                    pod.metadata.namespace,
+                    client.V1Eviction(
+                        metadata=client.V1ObjectMeta(
+                            name=pod.metadata.name,
+                            namespace=pod.metadata.namespace
+                        )
+                    )
+                )
+                for pod in to_evict
+            ), return_exceptions=True)
+
+            evicted = []
+            blocked = []
+            failed = []
+            for pod, outcome in zip(to_evict, results):
+                pod_name = f"{pod.metadata.namespace}/{pod.metadata.name}"
+                if not isinstance(outcome, Exception):
+                    evicted.append(pod_name)
+                elif isinstance(outcome, ApiException) and outcome.status == 404:
+                    # The pod went away on its own, as kubectl drain also accepts
+                    evicted.append(pod_name)
+                elif isinstance(outcome, ApiException) and outcome.status == 429:
+                    blocked.append(pod_name)
+                elif isinstance(outcome, ApiException):
+                    failed.append(f"{pod_name}: {outcome.status} {outcome.reason}")
+                else:
+                    failed.append(f"{pod_name}: {outcome}")
+
+            result = [f"Node {node_name} cordoned"]
+            result.extend(f"Evicted pod {pod_name}" for pod_name in evicted)
+            if blocked:
+                result.append("Eviction blocked by PodDisruptionBudget:")
+                result.extend(f"  - {pod_name}" for pod_name in blocked)
+            if failed:
+                result.append("Eviction failed:")
+                result.extend(f"  - {error}" for error in failed)
+            if blocked or failed:
+                result.append(f"Node {node_name} not fully drained: {len(blocked) + len(failed)} pod(s) remain")
+            else:
+                result.append(f"Node {node_name} drained")
+            return "\n".join(result)
+        except ApiException as e:
+            return f"Error draining node: {e}"
 
     @mcp.tool()
     async def get_cluster_metrics(
         output: str = "json"
     ) -> str:
         """Get cluster metrics (requires metrics-server)"""
-        return await run_kubectl_command(
-            "top",
-            ["nodes", "-o", output]
-        ) 
\ No newline at end of file
+        try:
+            api_client = k8s_manager.get_api_client()
+            response = await k8s_manager.call(
+                k8s_manager.get_custom_objects_api().list_cluster_custom_object,
+                "metrics.k8s.io",
+                "v1beta1",
+                "nodes"
+            )
+            return serialize_response(api_client, response, output)
+        except ApiException as e:
+            return f"Error getting cluster metrics: {e}"
@@ -1,5 +1,12 @@
+import json
+from dataclasses import dataclass, fields, replace
 from enum import Enum
-from typing import TypedDict, List, Dict, Any, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Iterable, Mapping, Optional, Tuple
+# Pydantic builds the tool argument models from these TypedDicts and only
+# accepts typing.TypedDict on Python 3.12+
+from typing_extensions import TypedDict
 
 class ContainerTemplate(Enum):
     NGINX = "nginx"
@@ -7,6 +14,15 @@ class ContainerTemplate(Enum):
     PYTHON = "python"
     CUSTOM = "custom"
 
+    def __init__(self, value: str):
+        # Position in definition order, used to index TEMPLATES
+        self.value_index = len(type(self).__members__)
+
+# Templates accepted by value ("nginx") or by name ("NGINX")
+TEMPLATE_LOOKUP: Dict[str, ContainerTemplate] = (
+    {t.value: t for t in ContainerTemplate} | {t.name: t for t in ContainerTemplate}
+)
+
 class ResourceConfig(TypedDict, total=False):
     requests: Dict[str, str]
     limits: Dict[str, str]
@@ -35,36 +51,151 @@ class CustomContainerConfig(TypedDict, total=False):
     args: List[str]
     volumeMounts: List[VolumeMountConfig]
 
-# Base templates for different container types
-container_templates: Dict[ContainerTemplate, CustomContainerConfig] = {
-    ContainerTemplate.NGINX: {
-        "image": "nginx:latest",
-        "ports": [{"containerPort": 80, "protocol": "TCP", "name": "http"}],
-        "resources": {
+@dataclass(frozen=True, slots=True)
+class ResourceSpec:
+    """Immutable resource requests and limits"""
+    requests: Optional[Mapping[str, str]] = None
+    limits: Optional[Mapping[str, str]] = None
+
+    @classmethod
+    def from_config(cls, resources: ResourceConfig) -> "ResourceSpec":
+        requests = resources.get("requests")
+        limits = resources.get("limits")
+        return cls(
+            requests=MappingProxyType(dict(requests)) if requests is not None else None,
+            limits=MappingProxyType(dict(limits)) if limits is not None else None
+        )
+
+@dataclass(frozen=True, slots=True)
+class TemplateSpec:
+    """Immutable container settings for a template
+
+    Specs are shared by every caller, so the nested port and env configs
+    must be treated as read-only.
+    """
+    image: Optional[str] = None
+    ports: Tuple[PortConfig, ...] = ()
+    env: Tuple[EnvVarConfig, ...] = ()
+    resources: Optional[ResourceSpec] = None
+    command: Optional[Tuple[str, ...]] = None
+    args: Optional[Tuple[str, ...]] = None
+
+# Base templates for different container types, indexed by ContainerTemplate.value_index
+TEMPLATES: Tuple[TemplateSpec, ...] = (
+    # NGINX
+    TemplateSpec(
+        image="nginx:latest",
+        ports=({"containerPort": 80, "protocol": "TCP", "name": "http"},),
+        resources=ResourceSpec.from_config({
             "requests": {"cpu": "100m", "memory": "128Mi"},
             "limits": {"cpu": "500m", "memory": "512Mi"}
-        }
-    },
-    ContainerTemplate.NODEJS: {
-        "image": "node:18",
-        "ports": [{"containerPort": 3000, "protocol": "TCP", "name": "http"}],
-        "resources": {
+        })
+    ),
+    # NODEJS
+    TemplateSpec(
+        image="node:18",
+        ports=({"containerPort": 3000, "protocol": "TCP", "name": "http"},),
+        resources=ResourceSpec.from_config({
             "requests": {"cpu": "200m", "memory": "256Mi"},
             "limits": {"cpu": "1000m", "memory": "1Gi"}
-        }
-    },
-    ContainerTemplate.PYTHON: {
-        "image": "python:3.9",
-        "ports": [{"containerPort": 8000, "protocol": "TCP", "name": "http"}],
-        "resources": {
+        })
+    ),
+    # PYTHON
+    TemplateSpec(
+        image="python:3.9",
+        ports=({"containerPort": 8000, "protocol": "TCP", "name": "http"},),
+        resources=ResourceSpec.from_config({
             "requests": {"cpu": "200m", "memory": "256Mi"},
             "limits": {"cpu": "1000m", "memory": "1Gi"}
-        }
-    },
-    ContainerTemplate.CUSTOM: {
-        "resources": {
+        })
+    ),
+    # CUSTOM
+    TemplateSpec(
+        resources=ResourceSpec.from_config({
             "requests": {"cpu": "100m", "memory": "128Mi"},
             "limits": {"cpu": "500m", "memory": "512Mi"}
-        }
+        })
+    )
+)
+
+assert len(TEMPLATES) == len(ContainerTemplate)
+
+_SEQUENCE_FIELDS = ("ports", "env", "command", "args")
+
+def merge_template(spec: TemplateSpec, custom_config: Optional[CustomContainerConfig]) -> TemplateSpec:
+    """Overlay a custom container config onto a template spec"""
+    if not custom_config:
+        return spec
+    overrides: Dict[str, Any] = {
+        field.name: custom_config[field.name]
+        for field in fields(TemplateSpec)
+        if custom_config.get(field.name) is not None
     }
-} 
\ No newline at end of file
+    for key in _SEQUENCE_FIELDS:
+        if key in overrides:
+            overrides[key] = tuple(overrides[key])
+    if "resources" in overrides:
+        overrides["resources"] = ResourceSpec.from_config(overrides["resources"])
+    return replace(spec, **overrides)
+
+def _without_none(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in fields.items() if value is not None}
+
+def build_container_ports(ports: Iterable[PortConfig]) -> List[Dict[str, Any]]:
+    return [
+        _without_none({
+            "containerPort": port["containerPort"],
+            "protocol": port.get("protocol", "TCP"),
+            "name": port.get("name")
+        })
+        for port in ports
+    ]
+
+def build_env_vars(env: Iterable[EnvVarConfig]) -> List[Dict[str, Any]]:
+    return [
+        _without_none({
+            "name": env_var["name"],
+            "value": env_var.get("value"),
+            "valueFrom": env_var.get("valueFrom")
+        })
+        for env_var in env
+    ]
+
+def build_resources(resources: ResourceSpec) -> Dict[str, Any]:
+    return _without_none({
+        "requests": dict(resources.requests) if resources.requests is not None else None,
+        "limits": dict(resources.limits) if resources.limits is not None else None
+    })
+
+def _container_from_spec(name: str, spec: TemplateSpec) -> Dict[str, Any]:
+    return _without_none({
+        "name": name,
+        "image": spec.image,
+        "ports": build_container_ports(spec.ports),
+        "env": build_env_vars(spec.env),
+        "resources": build_resources(spec.resources) if spec.resources is not None else None,
+        "command": list(spec.command) if spec.command is not None else None,
+        "args": list(spec.args) if spec.args is not None else None
+    })
+
+@lru_cache(maxsize=128)
+def _build_cached(template: ContainerTemplate, config_key: str) -> Dict[str, Any]:
+    # Placeholder name, build_container sets the real container name
+    custom_config = json.loads(config_key)
+    return _container_from_spec(
+        template.value,
+        merge_template(TEMPLATES[template.value_index], custom_config)
+    )
+
+def build_container(
+    name: str,
+    template: ContainerTemplate,
+    custom_config: Optional[CustomContainerConfig] = None
+) -> Dict[str, Any]:
+    """Build a container, as a manifest dict, from a template overlaid with an optional custom config
+    
+    Returns a shallow copy of a cached container. The nested port, env and
+    resource values are shared between callers and must not be mutated.
+    """
+    config_key = json.dumps(custom_config or {}, sort_keys=True)
+    return {**_build_cached(template, config_key), "name": name}
@@ -1,29 +1,176 @@
-from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+import orjson
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Iterable, List, Optional
 from mcp.server.fastmcp import FastMCP, Context
-from kubernetes.client import (
+from kubernetes_asyncio.client import (
+    ApiClient,
     V1CronJob,
     V1CronJobSpec,
     V1JobTemplateSpec,
     V1JobSpec,
     V1PodTemplateSpec,
     V1ObjectMeta,
-    V1PodSpec,
-    V1Container,
-    V1ResourceRequirements,
-    V1EnvVar,
-    V1ContainerPort
+    V1PodSpec
 )
-from kubernetes.client.rest import ApiException
+from kubernetes_asyncio.client.rest import ApiException
 
 from .k8s_manager import KubernetesManager
 from .container_templates import (
     ContainerTemplate,
-    container_templates,
+    TEMPLATE_LOOKUP,
+    build_container,
     CustomContainerConfig,
     PortConfig,
     EnvVarConfig
 )
 
+# Cronjobs fetched per list request when paging through the API server
+LIST_PAGE_SIZE = 500
+
+# Upper bound on concurrent API requests issued by a single log fetch
+LOG_FETCH_CONCURRENCY = 16
+
+# Upper bound on concurrent creates issued by a single batch request
+CREATE_BATCH_CONCURRENCY = 10
+
+async def gather_bounded(
+    coros: Iterable[Awaitable[Any]],
+    limit: int = LOG_FETCH_CONCURRENCY,
+    abort_on_throttle: bool = False
+) -> List[Any]:
+    """Await coroutines concurrently, at most `limit` at a time, preserving order.
+    
+    Callers build each coroutine with k8s_manager.call, so every request also
+    holds a slot of the shared in-flight semaphore. Errors, from the API or
+    the connection, are returned in place of results, so one failing item
+    never hides the outcome of the others. With `abort_on_throttle`, a 429
+    from the API server instead cancels the remaining requests and is raised.
+    """
+    semaphore = asyncio.Semaphore(limit)
+    
+    async def bounded(coro: Awaitable[Any]) -> Any:
+        async with semaphore:
+            try:
+                return await coro
+            except ApiException as e:
+                if abort_on_throttle and e.status == 429:
+                    raise
+                return e
+            except Exception as e:
+                return e
+    
+    try:
+        async with asyncio.TaskGroup() as task_group:
+            tasks = [task_group.create_task(bounded(coro)) for coro in coros]
+    except* ApiException as group:
+        raise group.exceptions[0] from None
+    return [task.result() for task in tasks]
+
+def _dump(obj: Any, api_client: Optional[ApiClient] = None) -> str:
+    """Serialize a response as JSON, sanitizing API models when a client is given"""
+    if api_client is not None:
+        obj = api_client.sanitize_for_serialization(obj)
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+def _err(e: ApiException) -> str:
+    """Reduce an API error to a compact JSON summary, logging the full body once"""
+    body = e.body.decode("utf-8", "replace") if isinstance(e.body, bytes) else (e.body or "")
+    logging.warning(f"Kubernetes API error {e.status} {e.reason}: {body}")
+    # The API server answers with a Status object whose message is the useful part
+    try:
+        message = orjson.loads(body).get("message") or body
+    except (orjson.JSONDecodeError, AttributeError):
+        message = body
+    return orjson.dumps({
+        "status": e.status,
+        "reason": e.reason,
+        "message": message[:512]
+    }).decode()
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def project_cronjob(cronjob: V1CronJob) -> Dict[str, Any]:
+    """Reduce a cronjob to the fields worth returning to the client"""
+    spec = cronjob.spec
+    status = cronjob.status
+    containers = spec.job_template.spec.template.spec.containers
+    
+    return {
+        "name": cronjob.metadata.name,
+        "namespace": cronjob.metadata.namespace,
+        "schedule": spec.schedule,
+        "suspend": spec.suspend,
+        "concurrencyPolicy": spec.concurrency_policy,
+        "lastScheduleTime": _isoformat(status.last_schedule_time) if status else None,
+        "lastSuccessfulTime": _isoformat(status.last_successful_time) if status else None,
+        "active": [ref.name for ref in (status.active or [])] if status else [],
+        "containers": [
+            {"name": container.name, "image": container.image}
+            for container in containers
+        ]
+    }
+
+def build_cronjob(
+    name: str,
+    namespace: str,
+    schedule: str,
+    template: str,
+    completions: int = 1,
+    parallelism: int = 1,
+    backoff_limit: int = 6,
+    custom_config: Optional[CustomContainerConfig] = None
+) -> V1CronJob:
+    """Build a cronjob object from a container template
+    
+    Raises ValueError if the template name is unknown.
+    """
+    template_enum = TEMPLATE_LOOKUP.get(template)
+    if template_enum is None:
+        raise ValueError(f"Invalid template. Must be one of: {', '.join(t.name for t in ContainerTemplate)}")
+    
+    container = build_container(name, template_enum, custom_config)
+    
+    if not container.get("image"):
+        raise ValueError(f"An image is required for the {template_enum.name} template")
+    
+    # Create cronjob
+    cronjob = V1CronJob(
+        api_version="batch/v1",
+        kind="CronJob",
+        metadata=V1ObjectMeta(
+            name=name,
+            namespace=namespace,
+            labels={
+                "mcp-managed": "true",
+                "app": name
+            }
+        ),
+        spec=V1CronJobSpec(
+            schedule=schedule,
+            job_template=V1JobTemplateSpec(
+                spec=V1JobSpec(
+                    completions=completions,
+                    parallelism=parallelism,
+                    backoff_limit=backoff_limit,
+                    template=V1PodTemplateSpec(
+                        metadata=V1ObjectMeta(
+                            labels={"app": name}
+                        ),
+                        spec=V1PodSpec(
+                            containers=[container],
+                            restart_policy="OnFailure"
+                        )
+                    )
+                )
+            )
+        )
+    )
+    
+    return cronjob
+
 def register_cronjob_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all cronjob-related tools with the MCP server"""
     
@@ -34,18 +181,41 @@ def register_cronjob_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Get cronjobs with optional filtering"""
         try:
-            if namespace:
-                response = await k8s_manager.get_batch_api().list_namespaced_cron_job(
-                    namespace,
-                    label_selector=label_selector
-                )
-            else:
-                response = await k8s_manager.get_batch_api().list_cron_job_for_all_namespaces(
-                    label_selector=label_selector
-                )
-            return str(response)
+            state_cache = k8s_manager.get_state_cache()
+            cronjobs = state_cache.cronjobs.list(namespace, label_selector)
+            if cronjobs is not None:
+                return _dump([project_cronjob(cronjob) for cronjob in cronjobs])
+            
+            # Cache not synced yet, page through the API server so only one
+            # page of full cronjob objects is held at a time
+            batch_api = k8s_manager.get_batch_api()
+            projected = []
+            continue_token = None
+            while True:
+                if namespace:
+                    response = await k8s_manager.call(
+                        batch_api.list_namespaced_cron_job,
+                        namespace,
+                        label_selector=label_selector,
+                        limit=LIST_PAGE_SIZE,
+                        _continue=continue_token
+                    )
+                else:
+                    response = await k8s_manager.call(
+                        batch_api.list_cron_job_for_all_namespaces,
+                        label_selector=label_selector,
+                        limit=LIST_PAGE_SIZE,
+                        _continue=continue_token
+                    )
+                projected.extend(project_cronjob(cronjob) for cronjob in response.items)
+                continue_token = response.metadata._continue
+                del response
+                if not continue_token:
+                    break
+            
+            return _dump(projected)
         except ApiException as e:
-            return f"Error getting cronjobs: {e}"
+            return _err(e)
 
     @mcp.tool()
     async def describe_cronjob(
@@ -54,13 +224,14 @@ def register_cronjob_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Describe a specific cronjob"""
         try:
-            response = await k8s_manager.get_batch_api().read_namespaced_cron_job(
+            response = await k8s_manager.call(
+                k8s_manager.get_batch_api().read_namespaced_cron_job,
                 cronjob_name,
                 namespace
             )
-            return str(response)
+            return _dump(project_cronjob(response))
         except ApiException as e:
-            return f"Error describing cronjob: {e}"
+            return _err(e)
 
     @mcp.tool()
     async def create_cronjob(
@@ -75,103 +246,75 @@ def register_cronjob_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Create a new cronjob using a template"""
         try:
-            template_enum = ContainerTemplate(template)
-        except ValueError:
-            return f"Invalid template. Must be one of: {', '.join(t.name for t in ContainerTemplate)}"
-        
-        template_config = container_templates[template_enum]
-        
-        # If using custom config, validate and merge
-        container_config: Dict[str, Any]
-        if custom_config:
-            container_config = {
-                **template_config,
-                **custom_config
-            }
-        else:
-            container_config = template_config
-        
-        # Create container ports
-        container_ports = [
-            V1ContainerPort(
-                container_port=port["containerPort"],
-                protocol=port.get("protocol", "TCP"),
-                name=port.get("name")
-            )
-            for port in container_config.get("ports", [])
-        ]
-        
-        # Create environment variables
-        env_vars = [
-            V1EnvVar(
-                name=env["name"],
-                value=env.get("value"),
-                value_from=env.get("valueFrom")
-            )
-            for env in container_config.get("env", [])
-        ]
-        
-        # Create resource requirements
-        resources = None
-        if "resources" in container_config:
-            resources = V1ResourceRequirements(
-                requests=container_config["resources"].get("requests"),
-                limits=container_config["resources"].get("limits")
-            )
-        
-        # Create container
-        container = V1Container(
-            name=name,
-            image=container_config["image"],
-            ports=container_ports,
-            env=env_vars,
-            resources=resources,
-            command=container_config.get("command"),
-            args=container_config.get("args")
-        )
-        
-        # Create cronjob
-        cronjob = V1CronJob(
-            api_version="batch/v1",
-            kind="CronJob",
-            metadata=V1ObjectMeta(
-                name=name,
-                namespace=namespace,
-                labels={
-                    "mcp-managed": "true",
-                    "app": name
-                }
-            ),
-            spec=V1CronJobSpec(
-                schedule=schedule,
-                job_template=V1JobTemplateSpec(
-                    spec=V1JobSpec(
-                        completions=completions,
-                        parallelism=parallelism,
-                        backoff_limit=backoff_limit,
-                        template=V1PodTemplateSpec(
-                            metadata=V1ObjectMeta(
-                                labels={"app": name}
-                            ),
-                            spec=V1PodSpec(
-                                containers=[container],
-                                restart_policy="OnFailure"
-                            )
-                        )
-                    )
-                )
+            cronjob = build_cronjob(
+                name,
+                namespace,
+                schedule,
+                template,
+                completions,
+                parallelism,
+                backoff_limit,
+                custom_config
             )
-        )
+        except ValueError as e:
+            return str(e)
         
         try:
-            response = await k8s_manager.get_batch_api().create_namespaced_cron_job(
+            response = await k8s_manager.call(
+                k8s_manager.get_batch_api().create_namespaced_cron_job,
                 namespace,
                 cronjob
             )
             k8s_manager.track_resource("CronJob", name, namespace)
-            return str(response)
+            return _dump(response, k8s_manager.get_api_client())
         except ApiException as e:
-            return f"Error creating cronjob: {e}"
+            return _err(e)
+
+    @mcp.tool()
+    async def create_cronjobs_batch(
+        cronjobs: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Create several cronjobs concurrently.
+        
+        Args:
+            cronjobs: Cronjob definitions, each with the same fields as
+                create_cronjob: name, namespace, schedule, template and
+                optionally completions, parallelism, backoff_limit and
+                custom_config
+                
+        Returns:
+            One status line per cronjob, in input order
+        """
+        results: List[Optional[str]] = [None] * len(cronjobs)
+        pending = []
+        for index, item in enumerate(cronjobs):
+            try:
+                pending.append((index, build_cronjob(**item)))
+            except (TypeError, ValueError) as e:
+                results[index] = f"Error creating cronjob {item.get('name')}: {e}"
+        
+        batch_api = k8s_manager.get_batch_api()
+        responses = await gather_bounded(
+            (
+                k8s_manager.call(batch_api.create_namespaced_cron_job, cronjob.metadata.namespace, cronjob)
+                for _, cronjob in pending
+            ),
+            CREATE_BATCH_CONCURRENCY
+        )
+        
+        for (index, cronjob), response in zip(pending, responses):
+            name = cronjob.metadata.name
+            namespace = cronjob.metadata.namespace
+            if isinstance(response, ApiException):
+                results[index] = f"Error creating cronjob {namespace}/{name}: {_err(response)}"
+            elif isinstance(response, Exception):
+                results[index] = f"Error creating cronjob {namespace}/{name}: {response}"
+            else:
+                k8s_manager.track_resource("CronJob", name, namespace)
+                results[index] = f"CronJob {namespace}/{name} created successfully"
+        
+        return "\n".join(results)
 
     @mcp.tool()
     async def delete_cronjob(
@@ -181,13 +324,14 @@ def register_cronjob_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Delete a cronjob"""
         try:
-            response = await k8s_manager.get_batch_api().delete_namespaced_cron_job(
+            response = await k8s_manager.call(
+                k8s_manager.get_batch_api().delete_namespaced_cron_job,
                 cronjob_name,
                 namespace
             )
-            return str(response)
+            return _dump(response, k8s_manager.get_api_client())
         except ApiException as e:
-            return f"Error deleting cronjob: {e}"
+            return _err(e)
 
     @mcp.tool()
     async def get_cronjob_logs(
@@ -199,36 +343,58 @@ def register_cronjob_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Get logs from a cronjob's jobs"""
         try:
-            # First get the cronjob to find its jobs
-            cronjob = await k8s_manager.get_batch_api().read_namespaced_cron_job(
-                cronjob_name,
-                namespace
-            )
+            # Jobs carry no cronjob label, so find them by owner reference,
+            # answering from the watch cache when it is synced
+            batch_api = k8s_manager.get_batch_api()
+            core_api = k8s_manager.get_core_api()
+            jobs = k8s_manager.get_state_cache().jobs.list(namespace)
+            if jobs is None:
+                response = await k8s_manager.call(batch_api.list_namespaced_job, namespace)
+                jobs = response.items
+            job_names = [
+                job.metadata.name
+                for job in jobs
+                if any(
+                    owner.kind == "CronJob" and owner.name == cronjob_name
+                    for owner in job.metadata.owner_references or []
+                )
+            ]
+            if not job_names:
+                return f"No jobs found for cronjob {cronjob_name}"
             
-            # Get jobs for this cronjob
-            jobs = await k8s_manager.get_batch_api().list_namespaced_job(
+            # A single set-based selector lists the pods of every job at once
+            pods = await k8s_manager.call(
+                core_api.list_namespaced_pod,
                 namespace,
-                label_selector=f"job-name={cronjob_name}"
+                label_selector=f"job-name in ({','.join(job_names)})"
             )
             
-            # Get logs from each job's pods
-            logs = []
-            for job in jobs.items:
-                pods = await k8s_manager.get_core_api().list_namespaced_pod(
-                    namespace,
-                    label_selector=f"job-name={job.metadata.name}"
-                )
-                
-                for pod in pods.items:
-                    pod_logs = await k8s_manager.get_core_api().read_namespaced_pod_log(
+            pod_logs = await gather_bounded(
+                (
+                    k8s_manager.call(
+                        core_api.read_namespaced_pod_log,
                         pod.metadata.name,
                         namespace,
                         container=container,
                         follow=follow,
                         tail_lines=tail_lines
                     )
-                    logs.append(f"=== Logs from pod {pod.metadata.name} in job {job.metadata.name} ===\n{pod_logs}")
+                    for pod in pods.items
+                ),
+                abort_on_throttle=True
+            )
+            
+            logs = []
+            for pod, pod_log in zip(pods.items, pod_logs):
+                pod_name = pod.metadata.name
+                job_name = (pod.metadata.labels or {}).get("job-name")
+                if isinstance(pod_log, ApiException):
+                    logs.append(f"=== Error getting logs from pod {pod_name} in job {job_name}: {_err(pod_log)} ===")
+                elif isinstance(pod_log, Exception):
+                    logs.append(f"=== Error getting logs from pod {pod_name} in job {job_name}: {pod_log} ===")
+                else:
+                    logs.append(f"=== Logs from pod {pod_name} in job {job_name} ===\n{pod_log}")
             
             return "\n".join(logs)
         except ApiException as e:
-            return f"Error getting cronjob logs: {e}" 
\ No newline at end of file
+            return _err(e) 
\ No newline at end of file
@@ -1,105 +1,169 @@
-from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional, Union
 from mcp.server.fastmcp import FastMCP, Context
-from kubernetes.client import (
-    V1Deployment,
-    V1DeploymentSpec,
-    V1PodTemplateSpec,
-    V1PodSpec,
-    V1Container,
-    V1ResourceRequirements,
-    V1EnvVar,
-    V1ContainerPort,
-    V1ObjectMeta,
-    V1LabelSelector,
-    V1Service,
-    V1ServiceSpec,
-    V1ServicePort
-)
-from kubernetes.client.rest import ApiException
+from kubernetes_asyncio import watch
+from kubernetes_asyncio.client.rest import ApiException
 import asyncio
+import io
+import orjson
 
 from .k8s_manager import KubernetesManager
+from .ttl_cache import TTLCache
 
-async def run_kubectl_command(command: str, args: List[str] = None) -> str:
-    """Run a kubectl command and return its output"""
-    try:
-        cmd = ["kubectl", command]
-        if args:
-            cmd.extend(args)
-        
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+# Separator between deployments in list output
+DEPLOYMENT_SEPARATOR = "-" * 50
+
+@dataclass(slots=True)
+class DeploymentSummary:
+    """Rollout state of a deployment, read from its API JSON"""
+    name: str
+    namespace: str
+    revision: Optional[str]
+    replicas: Optional[int]
+    updated: Optional[int]
+    ready: Optional[int]
+    available: Optional[int]
+    images: List[str]
+
+    @classmethod
+    def from_json(cls, deployment: Dict[str, Any]) -> "DeploymentSummary":
+        metadata = deployment.get("metadata") or {}
+        spec = deployment.get("spec") or {}
+        status = deployment.get("status") or {}
+        pod_spec = (spec.get("template") or {}).get("spec") or {}
+        return cls(
+            name=metadata.get("name"),
+            namespace=metadata.get("namespace"),
+            revision=(metadata.get("annotations") or {}).get("deployment.kubernetes.io/revision"),
+            replicas=spec.get("replicas"),
+            updated=status.get("updatedReplicas"),
+            ready=status.get("readyReplicas"),
+            available=status.get("availableReplicas"),
+            images=[container.get("image") for container in pod_spec.get("containers") or ()]
         )
-        
-        stdout, stderr = await process.communicate()
-        
-        if process.returncode != 0:
-            return f"Error: {stderr.decode()}"
-        
-        return stdout.decode()
-    except Exception as e:
-        return f"Error executing kubectl command: {str(e)}"
 
-def format_deployment_info(deployment: V1Deployment) -> str:
-    """Format deployment information into a readable string"""
-    spec = deployment.spec
-    status = deployment.status
-    metadata = deployment.metadata
-    
-    info = [
-        f"Deployment: {metadata.name}",
-        f"Namespace: {metadata.namespace}",
-        f"Replicas: {spec.replicas} (Desired) / {status.available_replicas} (Available)",
-        f"Strategy: {spec.strategy.type}",
-        "\nContainers:"
-    ]
+# Seconds expose_deployment waits for a LoadBalancer address
+LOAD_BALANCER_WAIT_TIMEOUT = 300
+
+# Deployments fetched per list request when paging through the API server
+LIST_PAGE_SIZE = 500
+
+def write_deployment_info(write: Callable[[str], Any], deployment: Dict[str, Any]) -> None:
+    """Write a deployment, in API JSON form, through `write` (e.g. a StringIO's write)"""
+    metadata = deployment.get("metadata") or {}
+    spec = deployment.get("spec") or {}
+    status = deployment.get("status") or {}
+    strategy = spec.get("strategy") or {}
+    pod_spec = (spec.get("template") or {}).get("spec") or {}
     
-    for container in spec.template.spec.containers:
-        info.append(f"  - {container.name}")
-        info.append(f"    Image: {container.image}")
-        if container.ports:
-            info.append("    Ports:")
-            for port in container.ports:
-                info.append(f"      - {port.container_port}/{port.protocol}")
-        if container.env:
-            info.append("    Environment:")
-            for env in container.env:
-                info.append(f"      - {env.name}={env.value}")
+    write(
+        f"Deployment: {metadata.get('name')}"
+        f"\nNamespace: {metadata.get('namespace')}"
+        f"\nReplicas: {spec.get('replicas')} (Desired) / {status.get('availableReplicas')} (Available)"
+        f"\nStrategy: {strategy.get('type')}"
+        "\n\nContainers:"
+    )
     
-    return "\n".join(info)
+    # Each field is looked up once per container, not again for the checks
+    for container in pod_spec.get("containers") or ():
+        name, image, ports, env_vars = (
+            container.get("name"),
+            container.get("image"),
+            container.get("ports"),
+            container.get("env")
+        )
+        write(f"\n  - {name}\n    Image: {image}")
+        if ports:
+            write("\n    Ports:")
+            for port in ports:
+                write(f"\n      - {port.get('containerPort')}/{port.get('protocol')}")
+        if env_vars:
+            write("\n    Environment:")
+            for env in env_vars:
+                write(f"\n      - {env.get('name')}={env.get('value')}")
+
+def format_deployment_info(deployment: Dict[str, Any]) -> str:
+    """Format deployment information, in API JSON form, into a readable string"""
+    buf = io.StringIO()
+    write_deployment_info(buf.write, deployment)
+    return buf.getvalue()
 
 def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all deployment-related tools with the MCP server"""
     
+    # Short-lived cache for read tools, invalidated by writes in the same namespace
+    read_cache = TTLCache()
+    
     @mcp.tool()
     async def get_deployments(
-        namespace: Optional[str] = None,
+        namespace: Optional[Union[str, List[str]]] = None,
         label_selector: Optional[str] = None
     ) -> str:
-        """Get deployments with optional filtering"""
-        try:
-            api = k8s_manager.get_apps_api()
-            if namespace:
-                response = api.list_namespaced_deployment(
-                    namespace,
-                    label_selector=label_selector
-                )
+        """Get deployments with optional filtering
+        
+        namespace may be a single namespace, a list of namespaces or a
+        comma-separated string; several namespaces are listed in parallel.
+        """
+        if isinstance(namespace, str):
+            namespace = [ns.strip() for ns in namespace.split(",") if ns.strip()]
+        namespaces = tuple(dict.fromkeys(namespace or ()))
+        
+        async def list_items(ns: Optional[str]) -> List[Dict[str, Any]]:
+            # Page through the raw JSON rather than deserializing every
+            # object into models
+            items = []
+            continue_token = None
+            while True:
+                list_kwargs = {
+                    "label_selector": label_selector,
+                    "limit": LIST_PAGE_SIZE,
+                    "_continue": continue_token
+                }
+                if ns:
+                    response = await k8s_manager.call_raw(
+                        k8s_manager.get_apps_api().list_namespaced_deployment,
+                        ns,
+                        **list_kwargs
+                    )
+                else:
+                    response = await k8s_manager.call_raw(
+                        k8s_manager.get_apps_api().list_deployment_for_all_namespaces,
+                        **list_kwargs
+                    )
+                page = orjson.loads(response)
+                items.extend(page.get("items") or ())
+                
+                continue_token = (page.get("metadata") or {}).get("continue")
+                if not continue_token:
+                    return items
+        
+        async def load() -> str:
+            if namespaces:
+                # call_raw holds the shared in-flight semaphore, which bounds the fan-out
+                results = await asyncio.gather(*(list_items(ns) for ns in namespaces))
             else:
-                response = api.list_deployment_for_all_namespaces(
-                    label_selector=label_selector
-                )
-            
-            if not response.items:
-                return "No deployments found"
+                results = [await list_items(None)]
             
-            result = []
-            for deployment in response.items:
-                result.append(format_deployment_info(deployment))
-                result.append("-" * 50)
+            buf = io.StringIO()
+            write = buf.write
+            count = 0
+            for items in results:
+                for deployment in items:
+                    if count:
+                        write("\n")
+                    write_deployment_info(write, deployment)
+                    write("\n")
+                    write(DEPLOYMENT_SEPARATOR)
+                    count += 1
             
-            return "\n".join(result)
+            if not count:
+                return "No deployments found"
+            return buf.getvalue()
+        
+        # A single namespace keeps a plain string key so invalidation matches it directly
+        cache_namespace = namespaces[0] if len(namespaces) == 1 else (namespaces or None)
+        try:
+            return await read_cache.get_or_load(("get_deployments", cache_namespace, label_selector), load)
         except ApiException as e:
             return f"Error getting deployments: {e}"
 
@@ -109,13 +173,16 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         namespace: str
     ) -> str:
         """Describe a specific deployment"""
-        try:
-            api = k8s_manager.get_apps_api()
-            response = api.read_namespaced_deployment(
+        async def load() -> str:
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_apps_api().read_namespaced_deployment,
                 deployment_name,
                 namespace
             )
-            return format_deployment_info(response)
+            return format_deployment_info(orjson.loads(response))
+        
+        try:
+            return await read_cache.get_or_load(("describe_deployment", namespace, deployment_name), load)
         except ApiException as e:
             return f"Error describing deployment: {e}"
 
@@ -130,88 +197,77 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         resources: Optional[Dict[str, Dict[str, str]]] = None
     ) -> str:
         """Create a new deployment with the specified configuration"""
-        # Create container ports
-        container_ports = []
+        # The body is built as a plain apps/v1 manifest; the client sends
+        # dicts as-is instead of validating and re-serializing V1* models
+        container: Dict[str, Any] = {"name": name, "image": image}
         if ports:
-            container_ports = [
-                V1ContainerPort(
-                    container_port=port["containerPort"],
-                    protocol=port.get("protocol", "TCP"),
-                    name=port.get("name")
-                )
+            container["ports"] = [
+                {
+                    "containerPort": port["containerPort"],
+                    "protocol": port.get("protocol", "TCP"),
+                    **({"name": port["name"]} if port.get("name") else {})
+                }
                 for port in ports
             ]
-        
-        # Create environment variables
-        env_vars = []
         if env:
-            env_vars = [
-                V1EnvVar(
-                    name=env_var["name"],
-                    value=env_var.get("value"),
-                    value_from=env_var.get("valueFrom")
-                )
+            container["env"] = [
+                {
+                    key: value
+                    for key, value in (
+                        ("name", env_var["name"]),
+                        ("value", env_var.get("value")),
+                        ("valueFrom", env_var.get("valueFrom"))
+                    )
+                    if value is not None
+                }
                 for env_var in env
             ]
-        
-        # Create resource requirements
-        container_resources = None
         if resources:
-            container_resources = V1ResourceRequirements(
-                requests=resources.get("requests"),
-                limits=resources.get("limits")
-            )
-        
-        # Create container
-        container = V1Container(
-            name=name,
-            image=image,
-            ports=container_ports,
-            env=env_vars,
-            resources=container_resources
-        )
+            container["resources"] = {
+                key: resources[key] for key in ("requests", "limits") if resources.get(key)
+            }
         
-        # Create deployment
-        deployment = V1Deployment(
-            api_version="apps/v1",
-            kind="Deployment",
-            metadata=V1ObjectMeta(
-                name=name,
-                namespace=namespace,
-                labels={
+        deployment = {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {
+                "name": name,
+                "namespace": namespace,
+                "labels": {
                     "mcp-managed": "true",
                     "app": name
                 }
-            ),
-            spec=V1DeploymentSpec(
-                replicas=replicas,
-                selector=V1LabelSelector(
-                    match_labels={
+            },
+            "spec": {
+                "replicas": replicas,
+                "selector": {
+                    "matchLabels": {
                         "app": name
                     }
-                ),
-                template=V1PodTemplateSpec(
-                    metadata=V1ObjectMeta(
-                        labels={
+                },
+                "template": {
+                    "metadata": {
+                        "labels": {
                             "app": name
                         }
-                    ),
-                    spec=V1PodSpec(
-                        containers=[container],
-                        restart_policy="Always"
-                    )
-                )
-            )
-        )
+                    },
+                    "spec": {
+                        "containers": [container],
+                        "restartPolicy": "Always"
+                    }
+                }
+            }
+        }
         
         try:
-            api = k8s_manager.get_apps_api()
-            response = api.create_namespaced_deployment(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_apps_api().create_namespaced_deployment,
                 namespace,
                 deployment
             )
             k8s_manager.track_resource("Deployment", name, namespace)
-            return f"Deployment created successfully:\n{format_deployment_info(response)}"
+            read_cache.invalidate(namespace)
+            return f"Deployment created successfully:\n{format_deployment_info(orjson.loads(response))}"
         except ApiException as e:
             return f"Error creating deployment: {e}"
 
@@ -223,11 +279,12 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Delete a deployment"""
         try:
-            api = k8s_manager.get_apps_api()
-            response = api.delete_namespaced_deployment(
+            await k8s_manager.call(
+                k8s_manager.get_apps_api().delete_namespaced_deployment,
                 deployment_name,
                 namespace
             )
+            read_cache.invalidate(namespace)
             return f"Deployment {deployment_name} deleted successfully"
         except ApiException as e:
             return f"Error deleting deployment: {e}"
@@ -240,12 +297,13 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Scale a deployment to a specific number of replicas"""
         try:
-            api = k8s_manager.get_apps_api()
-            response = api.patch_namespaced_deployment_scale(
+            await k8s_manager.call(
+                k8s_manager.get_apps_api().patch_namespaced_deployment_scale,
                 deployment_name,
                 namespace,
                 {"spec": {"replicas": replicas}}
             )
+            read_cache.invalidate(namespace)
             return f"Deployment {deployment_name} scaled to {replicas} replicas"
         except ApiException as e:
             return f"Error scaling deployment: {e}"
@@ -263,23 +321,29 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         
         try:
             if action == "restart":
-                response = await k8s_manager.get_apps_api().patch_namespaced_deployment(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_apps_api().patch_namespaced_deployment,
                     deployment_name,
                     namespace,
                     {"spec": {"template": {"metadata": {"annotations": {"kubectl.kubernetes.io/restartedAt": "now"}}}}}
                 )
             elif action == "undo":
-                response = await k8s_manager.get_apps_api().patch_namespaced_deployment(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_apps_api().patch_namespaced_deployment,
                     deployment_name,
                     namespace,
                     {"spec": {"template": {"metadata": {"annotations": {"kubectl.kubernetes.io/restartedAt": "now"}}}}}
                 )
             else:
-                response = await k8s_manager.get_apps_api().read_namespaced_deployment(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_apps_api().read_namespaced_deployment,
                     deployment_name,
                     namespace
                 )
-            return str(response)
+            if action in ("restart", "undo"):
+                read_cache.invalidate(namespace)
+            summary = DeploymentSummary.from_json(orjson.loads(response))
+            return orjson.dumps(summary, option=orjson.OPT_INDENT_2).decode()
         except ApiException as e:
             return f"Error performing rollout action: {e}"
 
@@ -293,30 +357,31 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Update a deployment's configuration"""
         try:
-            patch = {}
-            if image:
-                patch["spec"] = {"template": {"spec": {"containers": [{"name": deployment_name, "image": image}]}}}
+            # One patch carries every requested change. Strategic merge
+            # matches containers by name, so the other containers and
+            # fields of the pod template are left alone.
+            spec: Dict[str, Any] = {}
             if replicas is not None:
-                patch["spec"] = {"replicas": replicas}
+                spec["replicas"] = replicas
+            container: Dict[str, Any] = {"name": deployment_name}
+            if image:
+                container["image"] = image
             if env:
-                patch["spec"] = {
-                    "template": {
-                        "spec": {
-                            "containers": [{
-                                "name": deployment_name,
-                                "env": [{"name": e["name"], "value": e["value"]} for e in env]
-                            }]
-                        }
-                    }
-                }
+                container["env"] = [{"name": e["name"], "value": e["value"]} for e in env]
+            if len(container) > 1:
+                spec["template"] = {"spec": {"containers": [container]}}
+            if not spec:
+                return "No updates specified"
                 
-            api = k8s_manager.get_apps_api()
-            response = api.patch_namespaced_deployment(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_apps_api().patch_namespaced_deployment,
                 deployment_name,
                 namespace,
-                patch
+                {"spec": spec},
+                _content_type="application/strategic-merge-patch+json"
             )
-            return f"Deployment updated successfully:\n{format_deployment_info(response)}"
+            read_cache.invalidate(namespace)
+            return f"Deployment updated successfully:\n{format_deployment_info(orjson.loads(response))}"
         except ApiException as e:
             return f"Error updating deployment: {e}"
 
@@ -327,14 +392,16 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Get metrics for a deployment"""
         try:
-            response = await k8s_manager.get_custom_objects_api().get_namespaced_custom_object(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_custom_objects_api().get_namespaced_custom_object,
                 "metrics.k8s.io",
                 "v1beta1",
                 namespace,
                 "deployments",
                 deployment_name
             )
-            return str(response)
+            # Already JSON on the wire, so pass it through as-is
+            return response.decode()
         except ApiException as e:
             return f"Error getting deployment metrics: {e}"
 
@@ -348,41 +415,41 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Expose a deployment as a service"""
         try:
-            # Create service
-            service = V1Service(
-                api_version="v1",
-                kind="Service",
-                metadata=V1ObjectMeta(
-                    name=deployment_name,
-                    namespace=namespace,
-                    labels={
+            service = {
+                "apiVersion": "v1",
+                "kind": "Service",
+                "metadata": {
+                    "name": deployment_name,
+                    "namespace": namespace,
+                    "labels": {
                         "mcp-managed": "true",
                         "app": deployment_name
                     }
-                ),
-                spec=V1ServiceSpec(
-                    selector={
+                },
+                "spec": {
+                    "selector": {
                         "app": deployment_name
                     },
-                    ports=[
-                        V1ServicePort(
-                            port=port,
-                            target_port=target_port or port,
-                            protocol="TCP"
-                        )
+                    "ports": [
+                        {
+                            "port": port,
+                            "targetPort": target_port or port,
+                            "protocol": "TCP"
+                        }
                     ],
-                    type=service_type
-                )
-            )
+                    "type": service_type
+                }
+            }
             
             # Create the service
-            api = k8s_manager.get_core_api()
-            response = api.create_namespaced_service(
+            response = await k8s_manager.call(
+                k8s_manager.get_core_api().create_namespaced_service,
                 namespace,
                 service
             )
             
             k8s_manager.track_resource("Service", deployment_name, namespace)
+            k8s_manager.invalidate_services(namespace)
             
             # Get the service details
             service_info = []
@@ -394,16 +461,24 @@ def register_deployment_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
                 service_info.append(f"  - {port.port} -> {port.target_port}")
             
             if response.spec.type == "LoadBalancer":
-                # Wait for LoadBalancer IP
-                while True:
-                    service = api.read_namespaced_service(
-                        deployment_name,
-                        namespace
-                    )
-                    if service.status.load_balancer.ingress:
-                        service_info.append(f"External IP: {service.status.load_balancer.ingress[0].ip}")
-                        break
-                    await asyncio.sleep(1)
+                # Wait for the LoadBalancer address on one watch connection
+                # rather than re-reading the service every second
+                ingress = None
+                async with watch.Watch() as w:
+                    async for event in w.stream(
+                        k8s_manager.get_core_api().list_namespaced_service,
+                        namespace,
+                        field_selector=f"metadata.name={deployment_name}",
+                        timeout_seconds=LOAD_BALANCER_WAIT_TIMEOUT
+                    ):
+                        load_balancer = event["object"].status.load_balancer
+                        if load_balancer and load_balancer.ingress:
+                            ingress = load_balancer.ingress[0]
+                            break
+                if ingress:
+                    service_info.append(f"External IP: {ingress.ip or ingress.hostname}")
+                else:
+                    service_info.append("External IP: <pending>")
             
             return "Service created successfully:\n" + "\n".join(service_info)
         except ApiException as e:
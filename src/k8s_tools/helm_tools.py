@@ -1,10 +1,128 @@
 import asyncio
-from typing import Dict, Any, List, Optional
-from mcp.server.fastmcp import FastMCP
-from kubernetes.client.rest import ApiException
+import atexit
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, suppress
+from typing import Awaitable, Callable, Dict, Any, Iterator, List, Optional, Tuple
+from mcp.server.fastmcp import FastMCP, Context
+from .k8s_manager import KubernetesManager
+import orjson
+import yaml
 
-async def run_helm_command(command: str, args: List[str] = None) -> str:
-    """Run a Helm command and return its output"""
+# libyaml's emitter when PyYAML was built with it, the pure-Python one otherwise
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Seconds a successful `helm repo add` is remembered, so repeating it with the
+# same name, URL and credentials skips forking helm
+HELM_REPO_CACHE_TTL = 300
+
+# When each (name, url, credentials digest) repo was last added successfully
+_added_repos: Dict[Tuple[str, str, str], float] = {}
+
+# Values files kept for reuse by helm_install and helm_upgrade
+HELM_VALUES_CACHE_SIZE = 64
+
+# Private directory for values files, created on first use
+_values_dir: Optional[str] = None
+
+# Values file paths keyed by a digest of the values, least recently used first
+_values_files: OrderedDict[str, str] = OrderedDict()
+
+# Helm commands currently reading each values file, by digest; files in use
+# are never evicted
+_values_file_users: Dict[str, int] = {}
+
+# Upper bound on a single Helm invocation, in seconds. Helm's own --timeout
+# covers --wait; this only stops a hung process.
+HELM_COMMAND_TIMEOUT = 900
+
+# Seconds allowed beyond a caller's --timeout for Helm to finish and report
+HELM_TIMEOUT_MARGIN = 60
+
+# One component of a Go duration string such as "1h30m" or "300s"
+_DURATION_PART_RE = re.compile(r"(\d+(?:\.\d+)?)(h|ms|m|s|us|µs|ns)")
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1, "ms": 1e-3, "us": 1e-6, "µs": 1e-6, "ns": 1e-9}
+
+def _duration_seconds(duration: str) -> Optional[float]:
+    """Parse a Go duration as passed to `helm --timeout`, or None if it isn't one"""
+    parts = _DURATION_PART_RE.findall(duration)
+    if not parts or "".join(number + unit for number, unit in parts) != duration:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+def helm_command_timeout(timeout: Optional[str]) -> Optional[float]:
+    """Deadline for a Helm command that was given `--timeout timeout`
+    
+    The deadline never cuts a command short of the time the caller allowed
+    it; None, for a duration that can't be parsed, means no deadline.
+    """
+    if not timeout:
+        return HELM_COMMAND_TIMEOUT
+    seconds = _duration_seconds(timeout)
+    if seconds is None:
+        return None
+    return max(HELM_COMMAND_TIMEOUT, seconds + HELM_TIMEOUT_MARGIN)
+
+@contextmanager
+def helm_values_file(values: Optional[Dict[str, Any]]) -> Iterator[Optional[str]]:
+    """Provide a file holding values for `helm -f`, or None when there are none
+    
+    Files are named by a digest of the values and kept in a private temporary
+    directory, so repeated calls with the same values reuse one file. The
+    file is kept while the context is open.
+    """
+    global _values_dir
+    if not values:
+        yield None
+        return
+    
+    digest = hashlib.blake2b(
+        orjson.dumps(values, option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).hexdigest()
+    path = _values_files.get(digest)
+    if path is not None and os.path.exists(path):
+        _values_files.move_to_end(digest)
+    else:
+        if _values_dir is None:
+            _values_dir = tempfile.mkdtemp(prefix="k8s-mcp-helm-values-")
+            atexit.register(shutil.rmtree, _values_dir, True)
+        path = os.path.join(_values_dir, f"{digest}.yaml")
+        with open(path, "w") as f:
+            yaml.dump(values, f, Dumper=_YAML_DUMPER)
+        _values_files[digest] = path
+    
+    _values_file_users[digest] = _values_file_users.get(digest, 0) + 1
+    try:
+        excess = len(_values_files) - HELM_VALUES_CACHE_SIZE
+        if excess > 0:
+            idle = [key for key in _values_files if key not in _values_file_users]
+            for stale in idle[:excess]:
+                with suppress(FileNotFoundError):
+                    os.unlink(_values_files.pop(stale))
+        yield path
+    finally:
+        _values_file_users[digest] -= 1
+        if not _values_file_users[digest]:
+            del _values_file_users[digest]
+
+async def run_helm_command(
+    command: str,
+    args: List[str] = None,
+    on_output: Optional[Callable[[str], Awaitable[None]]] = None,
+    timeout: Optional[float] = HELM_COMMAND_TIMEOUT
+) -> str:
+    """Run a Helm command and return its output
+    
+    Stdout is read line by line as Helm produces it, and each line is passed
+    to `on_output` when given, so long-running commands can report progress.
+    The process is killed after `timeout` seconds; None waits indefinitely.
+    """
     try:
         cmd = ["helm", command]
         if args:
@@ -16,16 +134,38 @@ async def run_helm_command(command: str, args: List[str] = None) -> str:
             stderr=asyncio.subprocess.PIPE
         )
         
-        stdout, stderr = await process.communicate()
+        async def read_stdout() -> List[str]:
+            lines = []
+            async for raw_line in process.stdout:
+                line = raw_line.decode()
+                lines.append(line)
+                if on_output is not None:
+                    await on_output(line.rstrip("\n"))
+            return lines
+        
+        try:
+            # Stderr is drained alongside stdout so a full pipe can't stall Helm
+            stdout_lines, stderr = await asyncio.wait_for(
+                asyncio.gather(read_stdout(), process.stderr.read()),
+                timeout
+            )
+            await process.wait()
+        except asyncio.TimeoutError:
+            return f"Error: helm {command} did not finish within {timeout:g} seconds"
+        finally:
+            # Don't leave helm running if the call timed out or was cancelled
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
         
         if process.returncode != 0:
             return f"Error: {stderr.decode()}"
         
-        return stdout.decode()
+        return "".join(stdout_lines)
     except Exception as e:
         return f"Error executing Helm command: {str(e)}"
 
-def register_helm_tools(mcp: FastMCP):
+def register_helm_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all Helm-related tools with the MCP server"""
     
     @mcp.tool()
@@ -49,6 +189,12 @@ def register_helm_tools(mcp: FastMCP):
         Returns:
             Status of the repository addition
         """
+        # Only a digest of the credentials is kept in memory
+        credentials = hashlib.blake2b(f"{username}:{password}".encode(), digest_size=8).hexdigest()
+        cache_key = (name, url, credentials)
+        if not force_update and _added_repos.get(cache_key, 0) > time.monotonic() - HELM_REPO_CACHE_TTL:
+            return f"\"{name}\" already exists with the same configuration, skipping"
+        
         args = [name, url]
         
         if username and password:
@@ -56,7 +202,10 @@ def register_helm_tools(mcp: FastMCP):
         if force_update:
             args.append("--force-update")
             
-        return await run_helm_command("repo", ["add"] + args)
+        result = await run_helm_command("repo", ["add"] + args)
+        if not result.startswith("Error"):
+            _added_repos[cache_key] = time.monotonic()
+        return result
 
     @mcp.tool()
     async def helm_show_values(
@@ -94,7 +243,8 @@ def register_helm_tools(mcp: FastMCP):
         repo: Optional[str] = None,
         create_namespace: bool = True,
         wait: bool = True,
-        timeout: Optional[str] = None
+        timeout: Optional[str] = None,
+        ctx: Context = None
     ) -> str:
         """
         Install a Helm chart.
@@ -119,14 +269,6 @@ def register_helm_tools(mcp: FastMCP):
             "--namespace", namespace
         ]
         
-        if values:
-            # Create a temporary values file
-            import tempfile
-            import yaml
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                yaml.dump(values, f)
-                args.extend(["-f", f.name])
-        
         if version:
             args.extend(["--version", version])
         if repo:
@@ -138,7 +280,20 @@ def register_helm_tools(mcp: FastMCP):
         if timeout:
             args.extend(["--timeout", timeout])
         
-        return await run_helm_command("install", args)
+        with helm_values_file(values) as values_path:
+            if values_path:
+                args.extend(["-f", values_path])
+            
+            result = await run_helm_command(
+                "install",
+                args,
+                ctx.info if ctx else None,
+                helm_command_timeout(timeout)
+            )
+        
+        # The chart may have created Services, even if the command failed part way
+        k8s_manager.invalidate_services(namespace)
+        return result
 
     @mcp.tool()
     async def helm_upgrade(
@@ -151,7 +306,8 @@ def register_helm_tools(mcp: FastMCP):
         wait: bool = True,
         timeout: Optional[str] = None,
         force: bool = False,
-        reset_values: bool = False
+        reset_values: bool = False,
+        ctx: Context = None
     ) -> str:
         """
         Upgrade a Helm release.
@@ -177,14 +333,6 @@ def register_helm_tools(mcp: FastMCP):
             "--namespace", namespace
         ]
         
-        if values:
-            # Create a temporary values file
-            import tempfile
-            import yaml
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-                yaml.dump(values, f)
-                args.extend(["-f", f.name])
-        
         if version:
             args.extend(["--version", version])
         if repo:
@@ -198,4 +346,16 @@ def register_helm_tools(mcp: FastMCP):
         if reset_values:
             args.append("--reset-values")
         
-        return await run_helm_command("upgrade", args) 
\ No newline at end of file
+        with helm_values_file(values) as values_path:
+            if values_path:
+                args.extend(["-f", values_path])
+            
+            result = await run_helm_command(
+                "upgrade",
+                args,
+                ctx.info if ctx else None,
+                helm_command_timeout(timeout)
+            )
+        
+        k8s_manager.invalidate_services(namespace)
+        return result 
\ No newline at end of file
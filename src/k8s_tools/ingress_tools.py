@@ -1,39 +1,54 @@
 from typing import Dict, Any, List, Optional
 from mcp.server.fastmcp import FastMCP, Context
-from kubernetes.client import (
+from kubernetes_asyncio.client import (
     V1Ingress,
     V1IngressSpec,
     V1IngressRule,
     V1HTTPIngressRuleValue,
     V1HTTPIngressPath,
     V1IngressBackend,
+    V1IngressServiceBackend,
+    V1ServiceBackendPort,
     V1ObjectMeta
 )
-from kubernetes.client.api.networking_v1_api import NetworkingV1Api
-from kubernetes.client.rest import ApiException
+from kubernetes_asyncio.client.rest import ApiException
+import orjson
 
 from .k8s_manager import KubernetesManager
+from .ttl_cache import TTLCache
+
+def _dump(response: bytes) -> str:
+    """Re-indent a raw JSON API response for display"""
+    return orjson.dumps(orjson.loads(response), option=orjson.OPT_INDENT_2).decode()
 
 def register_ingress_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all ingress-related tools with the MCP server"""
     
+    # Short-lived cache for read tools, invalidated by writes in the same namespace
+    read_cache = TTLCache()
+    
     @mcp.tool()
     async def get_ingresses(
         namespace: Optional[str] = None,
         label_selector: Optional[str] = None
     ) -> str:
         """Get ingresses with optional filtering"""
-        try:
+        async def load() -> str:
             if namespace:
-                response = await k8s_manager.get_networking_api().list_namespaced_ingress(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_networking_api().list_namespaced_ingress,
                     namespace,
                     label_selector=label_selector
                 )
             else:
-                response = await k8s_manager.get_networking_api().list_ingress_for_all_namespaces(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_networking_api().list_ingress_for_all_namespaces,
                     label_selector=label_selector
                 )
-            return str(response)
+            return _dump(response)
+        
+        try:
+            return await read_cache.get_or_load(("get_ingresses", namespace, label_selector), load)
         except ApiException as e:
             return f"Error getting ingresses: {e}"
 
@@ -43,12 +58,16 @@ def register_ingress_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         namespace: str
     ) -> str:
         """Describe a specific ingress"""
-        try:
-            response = await k8s_manager.get_networking_api().read_namespaced_ingress(
+        async def load() -> str:
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_networking_api().read_namespaced_ingress,
                 ingress_name,
                 namespace
             )
-            return str(response)
+            return _dump(response)
+        
+        try:
+            return await read_cache.get_or_load(("describe_ingress", namespace, ingress_name), load)
         except ApiException as e:
             return f"Error describing ingress: {e}"
 
@@ -62,33 +81,29 @@ def register_ingress_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Create a new ingress"""
         # Create ingress rules
-        ingress_rules = []
-        for rule in rules:
-            paths = []
-            for path in rule.get("paths", []):
-                paths.append(
-                    V1HTTPIngressPath(
-                        path=path.get("path", "/"),
-                        path_type=path.get("pathType", "Prefix"),
-                        backend=V1IngressBackend(
-                            service=V1IngressBackend(
-                                name=path["service"]["name"],
-                                port=V1IngressBackend(
-                                    number=path["service"]["port"]
+        ingress_rules = [
+            V1IngressRule(
+                host=rule.get("host"),
+                http=V1HTTPIngressRuleValue(
+                    paths=[
+                        V1HTTPIngressPath(
+                            path=path.get("path", "/"),
+                            path_type=path.get("pathType", "Prefix"),
+                            backend=V1IngressBackend(
+                                service=V1IngressServiceBackend(
+                                    name=path["service"]["name"],
+                                    port=V1ServiceBackendPort(
+                                        number=path["service"]["port"]
+                                    )
                                 )
                             )
                         )
-                    )
-                )
-            
-            ingress_rules.append(
-                V1IngressRule(
-                    host=rule.get("host"),
-                    http=V1HTTPIngressRuleValue(
-                        paths=paths
-                    )
+                        for path in rule.get("paths", [])
+                    ]
                 )
             )
+            for rule in rules
+        ]
         
         # Create TLS configuration
         ingress_tls = None
@@ -121,12 +136,14 @@ def register_ingress_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         )
         
         try:
-            response = await k8s_manager.get_networking_api().create_namespaced_ingress(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_networking_api().create_namespaced_ingress,
                 namespace,
                 ingress
             )
             k8s_manager.track_resource("Ingress", name, namespace)
-            return str(response)
+            read_cache.invalidate(namespace)
+            return _dump(response)
         except ApiException as e:
             return f"Error creating ingress: {e}"
 
@@ -148,12 +165,14 @@ def register_ingress_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
             if annotations:
                 patch["metadata"] = {"annotations": annotations}
                 
-            response = await k8s_manager.get_networking_api().patch_namespaced_ingress(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_networking_api().patch_namespaced_ingress,
                 ingress_name,
                 namespace,
                 patch
             )
-            return str(response)
+            read_cache.invalidate(namespace)
+            return _dump(response)
         except ApiException as e:
             return f"Error updating ingress: {e}"
 
@@ -165,10 +184,12 @@ def register_ingress_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Delete an ingress"""
         try:
-            response = await k8s_manager.get_networking_api().delete_namespaced_ingress(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_networking_api().delete_namespaced_ingress,
                 ingress_name,
                 namespace
             )
-            return str(response)
+            read_cache.invalidate(namespace)
+            return _dump(response)
         except ApiException as e:
             return f"Error deleting ingress: {e}" 
\ No newline at end of file
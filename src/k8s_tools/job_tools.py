@@ -1,47 +1,129 @@
 from typing import Dict, Any, List, Optional
 from mcp.server.fastmcp import FastMCP, Context
-from kubernetes.client import (
-    V1Job,
-    V1JobSpec,
-    V1PodTemplateSpec,
-    V1ObjectMeta,
-    V1PodSpec,
-    V1Container,
-    V1ResourceRequirements,
-    V1EnvVar,
-    V1ContainerPort
-)
-from kubernetes.client.rest import ApiException
+from kubernetes_asyncio.client.rest import ApiException
+import orjson
 
+from .cronjob_tools import gather_bounded
 from .k8s_manager import KubernetesManager
+from .ttl_cache import TTLCache
 from .container_templates import (
     ContainerTemplate,
-    container_templates,
+    TEMPLATE_LOOKUP,
+    build_container,
     CustomContainerConfig,
     PortConfig,
     EnvVarConfig
 )
 
+# Default number of jobs returned per get_jobs page
+LIST_PAGE_SIZE = 500
+
+# Maximum pods of one job whose logs get_job_logs reads
+MAX_LOG_PODS = 100
+
+def _strip_managed_fields(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop metadata.managedFields in place, as kubectl does by default
+    
+    Server-side apply bookkeeping is often the largest part of an object and
+    tells the caller nothing about the job itself.
+    """
+    for item in items:
+        metadata = item.get("metadata")
+        if metadata:
+            metadata.pop("managedFields", None)
+    return items
+
+def _make_job(
+    name: str,
+    namespace: str,
+    container: Dict[str, Any],
+    completions: int,
+    parallelism: int,
+    backoff_limit: int
+) -> Dict[str, Any]:
+    """Build a job manifest as a plain dict, which the API client sends without model conversion"""
+    return {
+        "apiVersion": "batch/v1",
+        "kind": "Job",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "labels": {
+                "mcp-managed": "true",
+                "app": name
+            }
+        },
+        "spec": {
+            "completions": completions,
+            "parallelism": parallelism,
+            "backoffLimit": backoff_limit,
+            "template": {
+                "metadata": {
+                    "labels": {"app": name}
+                },
+                "spec": {
+                    "containers": [container],
+                    "restartPolicy": "OnFailure"
+                }
+            }
+        }
+    }
+
 def register_job_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all job-related tools with the MCP server"""
     
+    # Short-lived cache for read tools, invalidated by writes in the same namespace
+    read_cache = TTLCache()
+    
     @mcp.tool()
     async def get_jobs(
         namespace: Optional[str] = None,
-        label_selector: Optional[str] = None
+        label_selector: Optional[str] = None,
+        limit: int = LIST_PAGE_SIZE,
+        continue_token: Optional[str] = None
     ) -> str:
-        """Get jobs with optional filtering"""
-        try:
+        """Get one page of jobs with optional filtering
+        
+        Returns {"items": [...], "continue": token}; pass a non-null token
+        back as continue_token for the next page.
+        """
+        async def load() -> str:
+            if continue_token is None:
+                jobs = k8s_manager.get_state_cache().jobs.list(namespace, label_selector)
+                # Larger results page through the API server so continue tokens stay valid
+                if jobs is not None and len(jobs) <= limit:
+                    api_client = k8s_manager.get_api_client()
+                    return orjson.dumps({
+                        "items": _strip_managed_fields([api_client.sanitize_for_serialization(job) for job in jobs]),
+                        "continue": None
+                    }).decode()
+            
             if namespace:
-                response = await k8s_manager.get_batch_api().list_namespaced_job(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_batch_api().list_namespaced_job,
                     namespace,
-                    label_selector=label_selector
+                    label_selector=label_selector,
+                    limit=limit,
+                    _continue=continue_token
                 )
             else:
-                response = await k8s_manager.get_batch_api().list_job_for_all_namespaces(
-                    label_selector=label_selector
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_batch_api().list_job_for_all_namespaces,
+                    label_selector=label_selector,
+                    limit=limit,
+                    _continue=continue_token
                 )
-            return str(response)
+            page = orjson.loads(response)
+            return orjson.dumps({
+                "items": _strip_managed_fields(page.get("items") or []),
+                "continue": (page.get("metadata") or {}).get("continue")
+            }).decode()
+        
+        try:
+            return await read_cache.get_or_load(
+                ("get_jobs", namespace, label_selector, limit, continue_token),
+                load
+            )
         except ApiException as e:
             return f"Error getting jobs: {e}"
 
@@ -51,12 +133,18 @@ def register_job_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         namespace: str
     ) -> str:
         """Describe a specific job"""
+        async def load() -> str:
+            job = k8s_manager.get_state_cache().jobs.get(job_name, namespace)
+            if job is None:
+                job = await k8s_manager.call(
+                    k8s_manager.get_batch_api().read_namespaced_job,
+                    job_name,
+                    namespace
+                )
+            return k8s_manager.to_json(job)
+        
         try:
-            response = await k8s_manager.get_batch_api().read_namespaced_job(
-                job_name,
-                namespace
-            )
-            return str(response)
+            return await read_cache.get_or_load(("describe_job", namespace, job_name), load)
         except ApiException as e:
             return f"Error describing job: {e}"
 
@@ -71,97 +159,24 @@ def register_job_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         custom_config: Optional[CustomContainerConfig] = None
     ) -> str:
         """Create a new job using a template"""
-        try:
-            template_enum = ContainerTemplate(template)
-        except ValueError:
+        template_enum = TEMPLATE_LOOKUP.get(template)
+        if template_enum is None:
             return f"Invalid template. Must be one of: {', '.join(t.name for t in ContainerTemplate)}"
         
-        template_config = container_templates[template_enum]
-        
-        # If using custom config, validate and merge
-        container_config: Dict[str, Any]
-        if custom_config:
-            container_config = {
-                **template_config,
-                **custom_config
-            }
-        else:
-            container_config = template_config
-        
-        # Create container ports
-        container_ports = [
-            V1ContainerPort(
-                container_port=port["containerPort"],
-                protocol=port.get("protocol", "TCP"),
-                name=port.get("name")
-            )
-            for port in container_config.get("ports", [])
-        ]
-        
-        # Create environment variables
-        env_vars = [
-            V1EnvVar(
-                name=env["name"],
-                value=env.get("value"),
-                value_from=env.get("valueFrom")
-            )
-            for env in container_config.get("env", [])
-        ]
-        
-        # Create resource requirements
-        resources = None
-        if "resources" in container_config:
-            resources = V1ResourceRequirements(
-                requests=container_config["resources"].get("requests"),
-                limits=container_config["resources"].get("limits")
-            )
-        
-        # Create container
-        container = V1Container(
-            name=name,
-            image=container_config["image"],
-            ports=container_ports,
-            env=env_vars,
-            resources=resources,
-            command=container_config.get("command"),
-            args=container_config.get("args")
-        )
+        container = build_container(name, template_enum, custom_config)
         
         # Create job
-        job = V1Job(
-            api_version="batch/v1",
-            kind="Job",
-            metadata=V1ObjectMeta(
-                name=name,
-                namespace=namespace,
-                labels={
-                    "mcp-managed": "true",
-                    "app": name
-                }
-            ),
-            spec=V1JobSpec(
-                completions=completions,
-                parallelism=parallelism,
-                backoff_limit=backoff_limit,
-                template=V1PodTemplateSpec(
-                    metadata=V1ObjectMeta(
-                        labels={"app": name}
-                    ),
-                    spec=V1PodSpec(
-                        containers=[container],
-                        restart_policy="OnFailure"
-                    )
-                )
-            )
-        )
+        job = _make_job(name, namespace, container, completions, parallelism, backoff_limit)
         
         try:
-            response = await k8s_manager.get_batch_api().create_namespaced_job(
+            response = await k8s_manager.call(
+                k8s_manager.get_batch_api().create_namespaced_job,
                 namespace,
                 job
             )
             k8s_manager.track_resource("Job", name, namespace)
-            return str(response)
+            read_cache.invalidate(namespace)
+            return k8s_manager.to_json(response)
         except ApiException as e:
             return f"Error creating job: {e}"
 
@@ -173,11 +188,13 @@ def register_job_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Delete a job"""
         try:
-            response = await k8s_manager.get_batch_api().delete_namespaced_job(
+            response = await k8s_manager.call(
+                k8s_manager.get_batch_api().delete_namespaced_job,
                 job_name,
                 namespace
             )
-            return str(response)
+            read_cache.invalidate(namespace)
+            return k8s_manager.to_json(response)
         except ApiException as e:
             return f"Error deleting job: {e}"
 
@@ -191,29 +208,47 @@ def register_job_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Get logs from a job's pods"""
         try:
-            # First get the job to find its pods
-            job = await k8s_manager.get_batch_api().read_namespaced_job(
-                job_name,
-                namespace
-            )
+            # The job-name label already selects the job's pods, so the job
+            # itself is not read; the watch cache answers when it is synced
+            core_api = k8s_manager.get_core_api()
+            selector = f"job-name={job_name}"
+            pods = k8s_manager.get_state_cache().pods.list(namespace, label_selector=selector)
+            if pods is None:
+                response = await k8s_manager.call(
+                    core_api.list_namespaced_pod,
+                    namespace,
+                    label_selector=selector,
+                    limit=MAX_LOG_PODS
+                )
+                pods = response.items
+            if not pods:
+                return f"No pods found for job {job_name}"
+            pods = pods[:MAX_LOG_PODS]
             
-            # Get pods for this job
-            pods = await k8s_manager.get_core_api().list_namespaced_pod(
-                namespace,
-                label_selector=f"job-name={job_name}"
+            # Read every pod's log concurrently rather than one after another
+            pod_logs = await gather_bounded(
+                (
+                    k8s_manager.call(
+                        core_api.read_namespaced_pod_log,
+                        pod.metadata.name,
+                        namespace,
+                        container=container,
+                        follow=follow,
+                        tail_lines=tail_lines
+                    )
+                    for pod in pods
+                ),
+                abort_on_throttle=True
             )
             
-            # Get logs from each pod
             logs = []
-            for pod in pods.items:
-                pod_logs = await k8s_manager.get_core_api().read_namespaced_pod_log(
-                    pod.metadata.name,
-                    namespace,
-                    container=container,
-                    follow=follow,
-                    tail_lines=tail_lines
-                )
-                logs.append(f"=== Logs from pod {pod.metadata.name} ===\n{pod_logs}")
+            for pod, pod_log in zip(pods, pod_logs):
+                if isinstance(pod_log, ApiException):
+                    logs.append(f"=== Error getting logs from pod {pod.metadata.name}: {pod_log.reason} ===")
+                elif isinstance(pod_log, Exception):
+                    logs.append(f"=== Error getting logs from pod {pod.metadata.name}: {pod_log} ===")
+                else:
+                    logs.append(f"=== Logs from pod {pod.metadata.name} ===\n{pod_log}")
             
             return "\n".join(logs)
         except ApiException as e:
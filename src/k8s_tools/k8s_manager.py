@@ -1,27 +1,170 @@
-from kubernetes import client, config
-from kubernetes.client import ApiException
-from typing import Dict, Any, Optional
+from kubernetes_asyncio import client, config
+from kubernetes_asyncio.client.rest import ApiException, RESTResponse
+from kubernetes_asyncio.stream import WsApiClient
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import aiohttp
+import asyncio
 import logging
+import os
+import orjson
+import ssl
+
+from .cluster_cache import ClusterStateCache
+from .port_forward import PortForward
+from .ttl_cache import TTLCache
+
+# Maximum simultaneous connections held by the shared API client
+CONNECTION_POOL_SIZE = 100
+
+# Seconds an idle pooled connection stays open. Tool calls often arrive more
+# than aiohttp's default 15s apart, and reopening means a new TLS handshake.
+KEEPALIVE_TIMEOUT = 75.0
+
+# Maximum API requests in flight across all tools, so bursts of parallel
+# tool calls queue here instead of being throttled by the API server
+MAX_INFLIGHT_REQUESTS = int(os.environ.get("K8S_MCP_MAX_INFLIGHT", "32"))
+
+# Seconds a get_services result read from the API is reused while the watch
+# cache is not ready. Writes made through the tools invalidate it straight away.
+SERVICE_CACHE_TTL = float(os.environ.get("K8S_MCP_SERVICE_CACHE_TTL", "3"))
+
+# Seconds a 404 from a service read is remembered, so repeated lookups of a
+# mistyped name skip the API
+SERVICE_NOT_FOUND_TTL = 5.0
+
+# Read buffer for API responses; kubernetes_asyncio uses the same size so
+# watch events carrying large objects fit
+READ_BUFFER_SIZE = 2 ** 21
+
+def _pooled_session(configuration: client.Configuration) -> aiohttp.ClientSession:
+    """Build the API client's HTTP session with its pool size and keep-alive window
+    
+    kubernetes_asyncio only configures the connector's connection limit, so
+    the session is built here with the same TLS settings it would use.
+    """
+    ssl_context = ssl.create_default_context(cafile=configuration.ssl_ca_cert)
+    if configuration.cert_file:
+        ssl_context.load_cert_chain(configuration.cert_file, keyfile=configuration.key_file)
+    if not configuration.verify_ssl:
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    if configuration.disable_strict_ssl_verification:
+        ssl_context.verify_flags &= ~ssl.VERIFY_X509_STRICT
+    
+    connector = aiohttp.TCPConnector(
+        limit=CONNECTION_POOL_SIZE,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ssl=ssl_context
+    )
+    return aiohttp.ClientSession(connector=connector, trust_env=True, read_bufsize=READ_BUFFER_SIZE)
+
+@dataclass(slots=True)
+class TrackedResource:
+    """A resource created by a tool, deleted again by cleanup_resources"""
+    kind: str
+    name: str
+    namespace: str
 
 class KubernetesManager:
     def __init__(self):
+        # Tracked resources as parallel columns, so tracking is three appends;
+        # repeats are collapsed when the resources are read back
+        self._tracked_kinds: List[str] = []
+        self._tracked_names: List[str] = []
+        self._tracked_namespaces: List[str] = []
+        
+        # API clients, created by setup() inside the event loop
+        self._api_client: Optional[client.ApiClient] = None
+        self._core_api: Optional[client.CoreV1Api] = None
+        self._apps_api: Optional[client.AppsV1Api] = None
+        self._batch_api: Optional[client.BatchV1Api] = None
+        self._networking_api: Optional[client.NetworkingV1Api] = None
+        self._custom_objects_api: Optional[client.CustomObjectsApi] = None
+        self._ws_client: Optional[WsApiClient] = None
+        self._state_cache: Optional[ClusterStateCache] = None
+        # Running port forwards keyed by (service, namespace, local port)
+        self._port_forwards: Dict[Tuple[str, str, int], PortForward] = {}
+        # Service read caches live here so every tool that writes Services
+        # can invalidate them, not only the service tools
+        self._service_cache = TTLCache(ttl=SERVICE_CACHE_TTL)
+        self._service_not_found_cache = TTLCache(ttl=SERVICE_NOT_FOUND_TTL, maxsize=256)
+        self._api_semaphore = asyncio.Semaphore(MAX_INFLIGHT_REQUESTS)
+        
+    async def setup(self) -> None:
+        """Load cluster config and create the shared API client. Must run inside the event loop."""
+        if self._api_client is not None:
+            return
+        
+        configuration = client.Configuration()
         try:
             # Try to load in-cluster config first
-            config.load_incluster_config()
+            config.load_incluster_config(client_configuration=configuration)
         except config.ConfigException:
             try:
                 # Fall back to kubeconfig
-                config.load_kube_config()
+                await config.load_kube_config(client_configuration=configuration)
             except config.ConfigException as e:
                 raise RuntimeError("Could not configure kubernetes python client") from e
         
-        self._tracked_resources: Dict[str, Dict[str, str]] = {}
+        # Every tool shares this client's aiohttp session, so size its
+        # connection pool for bursts of parallel tool calls
+        configuration.connection_pool_maxsize = CONNECTION_POOL_SIZE
+        
+        self._api_client = client.ApiClient(configuration)
+        # Swap in a session whose connector also keeps idle connections open
+        # for KEEPALIVE_TIMEOUT; the default one has not opened any yet
+        rest_client = self._api_client.rest_client
+        default_session = rest_client.pool_manager
+        rest_client.pool_manager = _pooled_session(configuration)
+        await default_session.close()
+        self._core_api = client.CoreV1Api(self._api_client)
+        self._apps_api = client.AppsV1Api(self._api_client)
+        self._batch_api = client.BatchV1Api(self._api_client)
+        self._networking_api = client.NetworkingV1Api(self._api_client)
+        self._custom_objects_api = client.CustomObjectsApi(self._api_client)
+        
+        # Websocket endpoints (exec, attach) need their own client
+        self._ws_client = WsApiClient(configuration)
+        
+    async def aclose(self) -> None:
+        """Stop background watches and port forwards, and close the shared API clients"""
+        for port_forward in self._port_forwards.values():
+            await port_forward.close()
+        self._port_forwards.clear()
+        if self._state_cache is not None:
+            await self._state_cache.stop()
+            self._state_cache = None
+        if self._api_client is not None:
+            await self._api_client.close()
+            self._api_client = None
+        if self._ws_client is not None:
+            await self._ws_client.close()
+            self._ws_client = None
+        
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Await an API call while holding a slot of the shared in-flight semaphore"""
+        async with self._api_semaphore:
+            return await fn(*args, **kwargs)
+        
+    async def call_raw(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> bytes:
+        """Like call(), but return the raw JSON body instead of deserialized models
+        
+        Raises ApiException for non-2xx responses, as deserializing calls do.
+        """
+        async with self._api_semaphore:
+            response = await fn(*args, _preload_content=False, **kwargs)
+            data = await response.read()
+        if not 200 <= response.status <= 299:
+            raise ApiException(http_resp=RESTResponse(response, data))
+        return data
+        
+    def to_json(self, obj: Any) -> str:
+        """Serialize an API model as its JSON form, omitting unset fields"""
+        return orjson.dumps(self._api_client.sanitize_for_serialization(obj)).decode()
         
-        # Initialize API clients
-        self._core_api = client.CoreV1Api()
-        self._apps_api = client.AppsV1Api()
-        self._batch_api = client.BatchV1Api()
-        self._networking_api = client.NetworkingV1Api()
+    def get_api_client(self) -> client.ApiClient:
+        return self._api_client
         
     def get_core_api(self) -> client.CoreV1Api:
         return self._core_api
@@ -35,51 +178,117 @@ class KubernetesManager:
     def get_networking_api(self) -> client.NetworkingV1Api:
         return self._networking_api
         
+    def get_custom_objects_api(self) -> client.CustomObjectsApi:
+        return self._custom_objects_api
+        
+    def get_ws_client(self) -> WsApiClient:
+        """Return the shared client for websocket endpoints such as pod exec"""
+        return self._ws_client
+        
+    def get_service_cache(self) -> TTLCache:
+        """Return the cache of service listings read from the API"""
+        return self._service_cache
+        
+    def get_service_not_found_cache(self) -> TTLCache:
+        """Return the cache of 404 responses from service reads"""
+        return self._service_not_found_cache
+        
+    def invalidate_services(self, namespace: Optional[str] = None) -> None:
+        """Drop cached service reads after a tool creates, changes or deletes Services"""
+        self._service_cache.invalidate(namespace)
+        self._service_not_found_cache.invalidate(namespace)
+        
+    def get_state_cache(self) -> ClusterStateCache:
+        """Return the shared watch-backed state cache, created on first use"""
+        if self._state_cache is None:
+            self._state_cache = ClusterStateCache(self._api_client)
+        return self._state_cache
+        
+    async def start_port_forward(
+        self,
+        service_name: str,
+        namespace: str,
+        local_port: int,
+        remote_port: int
+    ) -> Tuple[PortForward, bool]:
+        """Forward local_port to a service port, reusing a running forward
+        
+        Returns the forward and whether it was newly started.
+        """
+        key = (service_name, namespace, local_port)
+        port_forward = self._port_forwards.get(key)
+        if port_forward is not None and port_forward.remote_port == remote_port:
+            return port_forward, False
+        if port_forward is not None:
+            await port_forward.close()
+            del self._port_forwards[key]
+        
+        port_forward = PortForward(self._core_api, self._ws_client, service_name, namespace, remote_port)
+        await port_forward.start(local_port)
+        self._port_forwards[key] = port_forward
+        return port_forward, True
+        
     def track_resource(self, kind: str, name: str, namespace: str) -> None:
         """Track a resource for cleanup purposes"""
-        key = f"{namespace}/{name}"
-        self._tracked_resources[key] = {
-            "kind": kind,
-            "name": name,
-            "namespace": namespace
-        }
+        self._tracked_kinds.append(kind)
+        self._tracked_names.append(name)
+        self._tracked_namespaces.append(namespace)
+        
+    def get_tracked_resources(self) -> Dict[Tuple[str, str, str], TrackedResource]:
+        """Return tracked resources keyed by (kind, namespace, name)
         
-    def get_tracked_resources(self) -> Dict[str, Dict[str, str]]:
-        return self._tracked_resources
+        Resources of different kinds may share a name, such as the Service
+        expose_deployment creates for its Deployment.
+        """
+        return {
+            (kind, namespace, name): TrackedResource(kind, name, namespace)
+            for kind, name, namespace in zip(self._tracked_kinds, self._tracked_names, self._tracked_namespaces)
+        }
         
-    def clear_tracked_resources(self) -> None:
-        self._tracked_resources.clear()
+    def clear_tracked_resources(self, count: Optional[int] = None) -> None:
+        """Forget the first count tracked entries, or all of them"""
+        for column in (self._tracked_kinds, self._tracked_names, self._tracked_namespaces):
+            del column[:count]
         
     async def cleanup_resources(self) -> None:
         """Clean up all tracked resources"""
-        for resource in self._tracked_resources.values():
-            try:
-                if resource["kind"] == "Deployment":
-                    self._apps_api.delete_namespaced_deployment(
-                        resource["name"],
-                        resource["namespace"]
-                    )
-                elif resource["kind"] == "Service":
-                    self._core_api.delete_namespaced_service(
-                        resource["name"],
-                        resource["namespace"]
-                    )
-                elif resource["kind"] == "Pod":
-                    self._core_api.delete_namespaced_pod(
-                        resource["name"],
-                        resource["namespace"]
-                    )
-                elif resource["kind"] == "Job":
-                    self._batch_api.delete_namespaced_job(
-                        resource["name"],
-                        resource["namespace"]
-                    )
-                elif resource["kind"] == "Ingress":
-                    self._networking_api.delete_namespaced_ingress(
-                        resource["name"],
-                        resource["namespace"]
-                    )
-            except ApiException as e:
-                logging.error(f"Failed to delete resource {resource}: {e}")
-                
-        self.clear_tracked_resources() 
\ No newline at end of file
+        delete_functions = {
+            "Deployment": self._apps_api.delete_namespaced_deployment,
+            "Service": self._core_api.delete_namespaced_service,
+            "Pod": self._core_api.delete_namespaced_pod,
+            "Job": self._batch_api.delete_namespaced_job,
+            "CronJob": self._batch_api.delete_namespaced_cron_job,
+            "Ingress": self._networking_api.delete_namespaced_ingress
+        }
+        
+        # Resources tracked while the deletes run are kept for the next cleanup
+        tracked_count = len(self._tracked_kinds)
+        resources_by_kind: Dict[str, List[TrackedResource]] = {}
+        for resource in self.get_tracked_resources().values():
+            resources_by_kind.setdefault(resource.kind, []).append(resource)
+        
+        # Deletes of every kind run together; the semaphore bounds how many are in flight
+        resources = []
+        deletes = []
+        skipped: List[TrackedResource] = []
+        for kind, group in resources_by_kind.items():
+            delete_function = delete_functions.get(kind)
+            if delete_function is None:
+                logging.warning(f"No delete function for {kind}, keeping {len(group)} resource(s) tracked")
+                skipped.extend(group)
+                continue
+            for resource in group:
+                resources.append(resource)
+                deletes.append(self.call(delete_function, resource.name, resource.namespace))
+        
+        results = await asyncio.gather(*deletes, return_exceptions=True)
+        for resource, result in zip(resources, results):
+            if isinstance(result, Exception):
+                logging.error(f"Failed to delete resource {resource}: {result}")
+        for resource in resources_by_kind.get("Service", ()):
+            self.invalidate_services(resource.namespace)
+        
+        self.clear_tracked_resources(tracked_count)
+        # Kinds cleanup cannot delete stay tracked rather than being forgotten
+        for resource in skipped:
+            self.track_resource(resource.kind, resource.name, resource.namespace)
\ No newline at end of file
@@ -1,24 +1,58 @@
+import re
 from typing import Dict, Any, List, Optional
 from mcp.server.fastmcp import FastMCP, Context
+from kubernetes_asyncio import client
+from kubernetes_asyncio.client.rest import ApiException
 
-from .pod_tools import run_kubectl_command
+from .cluster_tools import serialize_response
+from .k8s_manager import KubernetesManager
+from .ttl_cache import TTLCache
 
-def register_namespace_tools(mcp: FastMCP):
+# Label names and values: up to 63 alphanumerics, '-', '_' or '.', starting
+# and ending alphanumeric. Keys may add a DNS subdomain prefix and '/'.
+_LABEL_NAME_RE = re.compile(r"[a-zA-Z0-9](?:[a-zA-Z0-9._-]{0,61}[a-zA-Z0-9])?")
+_LABEL_PREFIX_RE = re.compile(r"[a-z0-9](?:[-a-z0-9]*[a-z0-9])?(?:\.[a-z0-9](?:[-a-z0-9]*[a-z0-9])?)*")
+
+def _label_error(key: str, value: str) -> Optional[str]:
+    """Return why the API server would reject a label, or None if it is valid"""
+    prefix, separator, name = key.rpartition("/")
+    if separator and not prefix:
+        return f"invalid label key: {key}"
+    if prefix and (len(prefix) > 253 or not _LABEL_PREFIX_RE.fullmatch(prefix)):
+        return f"invalid label key prefix: {prefix}"
+    if not _LABEL_NAME_RE.fullmatch(name):
+        return f"invalid label key: {key}"
+    if value and not _LABEL_NAME_RE.fullmatch(value):
+        return f"invalid label value for {key}: {value}"
+    return None
+
+def register_namespace_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all namespace-related tools with the MCP server"""
     
+    # Short-lived cache for read tools, invalidated by namespace writes
+    read_cache = TTLCache()
+    
     @mcp.tool()
     async def get_namespaces(
         label_selector: Optional[str] = None,
         output: str = "json"
     ) -> str:
         """Get all namespaces with optional filtering"""
-        args = ["namespaces"]
+        async def load() -> str:
+            namespaces = k8s_manager.get_state_cache().namespaces.list(label_selector=label_selector)
+            if namespaces is None:
+                response = await k8s_manager.call(
+                    k8s_manager.get_core_api().list_namespace,
+                    label_selector=label_selector
+                )
+            else:
+                response = client.V1NamespaceList(api_version="v1", kind="NamespaceList", items=namespaces)
+            return serialize_response(k8s_manager.get_api_client(), response, output)
         
-        if label_selector:
-            args.extend(["-l", label_selector])
-        
-        args.extend(["-o", output])
-        return await run_kubectl_command("get", args)
+        try:
+            return await read_cache.get_or_load(("get_namespaces", None, label_selector, output), load)
+        except ApiException as e:
+            return f"Error getting namespaces: {e}"
 
     @mcp.tool()
     async def describe_namespace(
@@ -26,10 +60,13 @@ def register_namespace_tools(mcp: FastMCP):
         output: str = "yaml"
     ) -> str:
         """Describe a specific namespace"""
-        return await run_kubectl_command(
-            "describe",
-            ["namespace", namespace, "-o", output]
-        )
+        try:
+            response = k8s_manager.get_state_cache().namespaces.get(namespace)
+            if response is None:
+                response = await k8s_manager.call(k8s_manager.get_core_api().read_namespace, namespace)
+            return serialize_response(k8s_manager.get_api_client(), response, output)
+        except ApiException as e:
+            return f"Error describing namespace: {e}"
 
     @mcp.tool()
     async def create_namespace(
@@ -37,13 +74,23 @@ def register_namespace_tools(mcp: FastMCP):
         labels: Optional[Dict[str, str]] = None
     ) -> str:
         """Create a new namespace"""
-        args = ["create", "namespace", name]
+        # Reject bad labels here rather than after a round-trip to the API server
+        for key, value in (labels or {}).items():
+            error = _label_error(key, value)
+            if error:
+                return f"Error creating namespace: {error}"
         
-        if labels:
-            label_str = ",".join(f"{k}={v}" for k, v in labels.items())
-            args.extend(["--labels", label_str])
-            
-        return await run_kubectl_command(*args)
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_core_api().create_namespace,
+                client.V1Namespace(
+                    metadata=client.V1ObjectMeta(name=name, labels=labels)
+                )
+            )
+            read_cache.invalidate(name)
+            return f"Namespace {name} created"
+        except ApiException as e:
+            return f"Error creating namespace: {e}"
 
     @mcp.tool()
     async def delete_namespace(
@@ -51,12 +98,16 @@ def register_namespace_tools(mcp: FastMCP):
         force: bool = False
     ) -> str:
         """Delete a namespace"""
-        args = ["delete", "namespace", name]
-        
-        if force:
-            args.append("--force")
-            
-        return await run_kubectl_command(*args)
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_core_api().delete_namespace,
+                name,
+                grace_period_seconds=0 if force else None
+            )
+            read_cache.invalidate(name)
+            return f"Namespace {name} deleted"
+        except ApiException as e:
+            return f"Error deleting namespace: {e}"
 
     @mcp.tool()
     async def get_namespace_quota(
@@ -64,7 +115,14 @@ def register_namespace_tools(mcp: FastMCP):
         output: str = "json"
     ) -> str:
         """Get resource quota for a namespace"""
-        return await run_kubectl_command(
-            "get",
-            ["quota", "-n", namespace, "-o", output]
-        ) 
\ No newline at end of file
+        async def load() -> str:
+            response = await k8s_manager.call(
+                k8s_manager.get_core_api().list_namespaced_resource_quota,
+                namespace
+            )
+            return serialize_response(k8s_manager.get_api_client(), response, output)
+        
+        try:
+            return await read_cache.get_or_load(("get_namespace_quota", namespace, output), load)
+        except ApiException as e:
+            return f"Error getting namespace quota: {e}"
\ No newline at end of file
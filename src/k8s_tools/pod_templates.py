@@ -1,5 +1,6 @@
 from enum import Enum
-from typing import Dict, Any, List, Optional, TypedDict
+from typing import Dict, Any, List, Optional
+from typing_extensions import TypedDict
 
 class ContainerTemplate(str, Enum):
     """Available container templates"""
@@ -9,6 +10,9 @@ class ContainerTemplate(str, Enum):
     MYSQL = "MYSQL"
     CUSTOM = "CUSTOM"
 
+# Templates by value, so lookups of unknown names don't raise
+TEMPLATE_LOOKUP: Dict[str, ContainerTemplate] = {t.value: t for t in ContainerTemplate}
+
 class PortConfig(TypedDict, total=False):
     """Port configuration for containers"""
     containerPort: int
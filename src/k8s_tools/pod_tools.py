@@ -1,102 +1,197 @@
-import asyncio
-from typing import Dict, Any, List, Optional
+import io
+from collections import ChainMap
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Mapping, Optional, Tuple
 from mcp.server.fastmcp import FastMCP, Context
-from kubernetes.client import (
-    V1Pod,
-    V1PodSpec,
-    V1Container,
-    V1ResourceRequirements,
-    V1EnvVar,
-    V1ContainerPort,
-    V1ObjectMeta
-)
-from kubernetes.client.rest import ApiException
+from kubernetes_asyncio.client import V1Pod
+from kubernetes_asyncio import client as async_client
+from kubernetes_asyncio.client.rest import ApiException
+from kubernetes_asyncio.stream import WsApiClient
+from kubernetes_asyncio.stream.ws_client import ERROR_CHANNEL, STDERR_CHANNEL, STDOUT_CHANNEL
 
+from .cluster_tools import serialize_response
 from .k8s_manager import KubernetesManager
+from .ttl_cache import TTLCache
 from .pod_templates import (
     ContainerTemplate,
+    TEMPLATE_LOOKUP,
     pod_templates,
     PodConfig,
     ContainerConfig
 )
 
-async def run_kubectl_command(command: str, args: List[str] = None) -> str:
-    """Run a kubectl command and return its output"""
-    try:
-        cmd = ["kubectl", command]
-        if args:
-            cmd.extend(args)
-        
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
-        
-        if process.returncode != 0:
-            return f"Error: {stderr.decode()}"
-        
-        return stdout.decode()
-    except Exception as e:
-        return f"Error executing kubectl command: {str(e)}"
+# Default number of pods returned per get_pods page
+LIST_PAGE_SIZE = 500
 
-def format_pod_info(pod: V1Pod) -> str:
-    """Format pod information into a readable string"""
-    status = pod.status
-    spec = pod.spec
-    metadata = pod.metadata
+# Separator between pods in list output
+POD_SEPARATOR = "-" * 50
+
+# Ports, env vars and resources of a container, in API JSON form
+ContainerParts = Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+def _without_none(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in fields.items() if value is not None}
+
+def _container_parts(pod_config: Mapping[str, Any]) -> ContainerParts:
+    """Build the port, env and resource fields for a pod config
     
-    info = [
-        f"Pod: {metadata.name}",
-        f"Namespace: {metadata.namespace}",
-        f"Status: {status.phase}",
-        f"Node: {status.host_ip}",
-        f"IP: {status.pod_ip}",
-        "\nContainers:"
+    The config may be a shared template, so nested values are copied into
+    the result rather than referenced.
+    """
+    # Create container ports
+    container_ports = [
+        _without_none({
+            "containerPort": port["containerPort"],
+            "protocol": port.get("protocol", "TCP"),
+            "name": port.get("name")
+        })
+        for port in pod_config.get("ports", [])
     ]
     
-    for container in spec.containers:
-        info.append(f"  - {container.name}")
-        info.append(f"    Image: {container.image}")
-        if container.ports:
-            info.append("    Ports:")
-            for port in container.ports:
-                info.append(f"      - {port.container_port}/{port.protocol}")
+    # Create environment variables
+    env_vars = [
+        _without_none({
+            "name": env["name"],
+            "value": env.get("value"),
+            "valueFrom": env.get("valueFrom")
+        })
+        for env in pod_config.get("env", [])
+    ]
     
-    return "\n".join(info)
+    # Create resource requirements
+    resources = None
+    if pod_config.get("resources"):
+        requests = pod_config["resources"].get("requests")
+        limits = pod_config["resources"].get("limits")
+        resources = _without_none({
+            "requests": dict(requests) if requests is not None else None,
+            "limits": dict(limits) if limits is not None else None
+        })
+    
+    return container_ports, env_vars, resources
+
+@lru_cache(maxsize=None)
+def _template_container_parts(template: ContainerTemplate) -> ContainerParts:
+    """Container parts for an unmodified template, built once per template"""
+    return _container_parts(pod_templates[template])
+
+def _make_pod(name: str, namespace: str, container: Dict[str, Any], restart_policy: str) -> Dict[str, Any]:
+    """Build a pod manifest as a plain dict
+    
+    The API client sends dict bodies as they are, skipping the per-field
+    setters and the serialization walk that client models go through.
+    """
+    return {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {
+            "name": name,
+            "namespace": namespace,
+            "labels": {
+                "mcp-managed": "true",
+                "app": name
+            }
+        },
+        "spec": {
+            "containers": [container],
+            "restartPolicy": restart_policy
+        }
+    }
+
+def write_pod_info(write: Callable[[str], Any], pod: V1Pod) -> None:
+    """Write pod information through `write` (e.g. a StringIO's write)"""
+    status = pod.status
+    metadata = pod.metadata
+    
+    write(
+        f"Pod: {metadata.name}"
+        f"\nNamespace: {metadata.namespace}"
+        f"\nStatus: {status.phase}"
+        f"\nNode: {status.host_ip}"
+        f"\nIP: {status.pod_ip}"
+        "\n\nContainers:"
+    )
+    
+    for container in pod.spec.containers:
+        write(f"\n  - {container.name}\n    Image: {container.image}")
+        ports = container.ports
+        if ports:
+            write("\n    Ports:")
+            for port in ports:
+                write(f"\n      - {port.container_port}/{port.protocol}")
+
+def format_pod_info(pod: V1Pod) -> str:
+    """Format pod information into a readable string"""
+    buf = io.StringIO()
+    write_pod_info(buf.write, pod)
+    return buf.getvalue()
 
 def register_pod_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all pod-related tools with the MCP server"""
     
+    # Short-lived cache for read tools, invalidated by writes in the same namespace
+    read_cache = TTLCache()
+    
     @mcp.tool()
     async def get_pods(
         namespace: Optional[str] = None,
-        label_selector: Optional[str] = None
+        label_selector: Optional[str] = None,
+        limit: int = LIST_PAGE_SIZE,
+        continue_token: Optional[str] = None
     ) -> str:
-        """Get pods with optional filtering"""
-        try:
-            api = k8s_manager.get_core_api()
-            if namespace:
-                response = api.list_namespaced_pod(
-                    namespace,
-                    label_selector=label_selector
-                )
-            else:
-                response = api.list_pod_for_all_namespaces(
-                    label_selector=label_selector
-                )
+        """Get one page of pods with optional filtering
+        
+        When more pods remain, the output ends with a continue token to pass
+        back for the next page.
+        """
+        async def load() -> str:
+            pods = None
+            next_token = None
+            if continue_token is None:
+                pods = k8s_manager.get_state_cache().pods.list(namespace, label_selector)
+                if pods is not None and len(pods) > limit:
+                    # Page through the API server so continue tokens stay valid
+                    pods = None
+            if pods is None:
+                api = k8s_manager.get_core_api()
+                if namespace:
+                    response = await k8s_manager.call(
+                        api.list_namespaced_pod,
+                        namespace,
+                        label_selector=label_selector,
+                        limit=limit,
+                        _continue=continue_token
+                    )
+                else:
+                    response = await k8s_manager.call(
+                        api.list_pod_for_all_namespaces,
+                        label_selector=label_selector,
+                        limit=limit,
+                        _continue=continue_token
+                    )
+                pods = response.items
+                next_token = response.metadata._continue
             
-            if not response.items:
+            if not pods:
                 return "No pods found"
             
-            result = []
-            for pod in response.items:
-                result.append(format_pod_info(pod))
-                result.append("-" * 50)
-            
-            return "\n".join(result)
+            # All pods are written into one buffer rather than joined per pod
+            buf = io.StringIO()
+            write = buf.write
+            for i, pod in enumerate(pods):
+                if i:
+                    write("\n")
+                write_pod_info(write, pod)
+                write(f"\n{POD_SEPARATOR}")
+            if next_token:
+                write(f"\nMore pods available, continue_token: {next_token}")
+            return buf.getvalue()
+        
+        try:
+            return await read_cache.get_or_load(
+                ("get_pods", namespace, label_selector, limit, continue_token),
+                load
+            )
         except ApiException as e:
             return f"Error getting pods: {e}"
 
@@ -106,13 +201,19 @@ def register_pod_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         namespace: str
     ) -> str:
         """Describe a specific pod"""
+        async def load() -> str:
+            pod = k8s_manager.get_state_cache().pods.get(pod_name, namespace)
+            if pod is None:
+                api = k8s_manager.get_core_api()
+                pod = await k8s_manager.call(
+                    api.read_namespaced_pod,
+                    pod_name,
+                    namespace
+                )
+            return format_pod_info(pod)
+        
         try:
-            api = k8s_manager.get_core_api()
-            response = api.read_namespaced_pod(
-                pod_name,
-                namespace
-            )
-            return format_pod_info(response)
+            return await read_cache.get_or_load(("describe_pod", namespace, pod_name), load)
         except ApiException as e:
             return f"Error describing pod: {e}"
 
@@ -124,87 +225,49 @@ def register_pod_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         custom_config: Optional[PodConfig] = None
     ) -> str:
         """Create a new pod using a template"""
-        try:
-            template_enum = ContainerTemplate(template)
-        except ValueError:
+        template_enum = TEMPLATE_LOOKUP.get(template)
+        if template_enum is None:
             return f"Invalid template. Must be one of: {', '.join(t.name for t in ContainerTemplate)}"
         
         template_config = pod_templates[template_enum]
         
-        # If using custom config, validate and merge
-        pod_config: Dict[str, Any]
+        # Custom settings shadow the template's without copying either
+        pod_config: Mapping[str, Any]
         if custom_config:
-            pod_config = {
-                **template_config,
-                **custom_config
-            }
+            pod_config = ChainMap(custom_config, template_config)
         else:
             pod_config = template_config
         
-        # Create container ports
-        container_ports = [
-            V1ContainerPort(
-                container_port=port["containerPort"],
-                protocol=port.get("protocol", "TCP"),
-                name=port.get("name")
-            )
-            for port in pod_config.get("ports", [])
-        ]
-        
-        # Create environment variables
-        env_vars = [
-            V1EnvVar(
-                name=env["name"],
-                value=env.get("value"),
-                value_from=env.get("valueFrom")
-            )
-            for env in pod_config.get("env", [])
-        ]
-        
-        # Create resource requirements
-        resources = None
-        if pod_config.get("resources"):
-            resources = V1ResourceRequirements(
-                requests=pod_config["resources"].get("requests"),
-                limits=pod_config["resources"].get("limits")
-            )
+        if custom_config:
+            container_ports, env_vars, resources = _container_parts(pod_config)
+        else:
+            container_ports, env_vars, resources = _template_container_parts(template_enum)
         
         # Create container
-        container = V1Container(
-            name=name,
-            image=pod_config["image"],
-            ports=container_ports,
-            env=env_vars,
-            resources=resources,
-            command=pod_config.get("command"),
-            args=pod_config.get("args")
-        )
+        command = pod_config.get("command")
+        args = pod_config.get("args")
+        container = _without_none({
+            "name": name,
+            "image": pod_config["image"],
+            "ports": container_ports,
+            "env": env_vars,
+            "resources": resources,
+            "command": list(command) if command is not None else None,
+            "args": list(args) if args is not None else None
+        })
         
         # Create pod
-        pod = V1Pod(
-            api_version="v1",
-            kind="Pod",
-            metadata=V1ObjectMeta(
-                name=name,
-                namespace=namespace,
-                labels={
-                    "mcp-managed": "true",
-                    "app": name
-                }
-            ),
-            spec=V1PodSpec(
-                containers=[container],
-                restart_policy=pod_config.get("restartPolicy", "Always")
-            )
-        )
+        pod = _make_pod(name, namespace, container, pod_config.get("restartPolicy", "Always"))
         
         try:
             api = k8s_manager.get_core_api()
-            response = api.create_namespaced_pod(
+            response = await k8s_manager.call(
+                api.create_namespaced_pod,
                 namespace,
                 pod
             )
             k8s_manager.track_resource("Pod", name, namespace)
+            read_cache.invalidate(namespace)
             return f"Pod created successfully:\n{format_pod_info(response)}"
         except ApiException as e:
             return f"Error creating pod: {e}"
@@ -218,10 +281,12 @@ def register_pod_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         """Delete a pod"""
         try:
             api = k8s_manager.get_core_api()
-            response = api.delete_namespaced_pod(
+            response = await k8s_manager.call(
+                api.delete_namespaced_pod,
                 pod_name,
                 namespace
             )
+            read_cache.invalidate(namespace)
             return f"Pod {pod_name} deleted successfully"
         except ApiException as e:
             return f"Error deleting pod: {e}"
@@ -237,7 +302,8 @@ def register_pod_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         """Get logs from a pod"""
         try:
             api = k8s_manager.get_core_api()
-            response = api.read_namespaced_pod_log(
+            response = await k8s_manager.call(
+                api.read_namespaced_pod_log,
                 pod_name,
                 namespace,
                 container=container,
@@ -257,25 +323,45 @@ def register_pod_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Execute a command in a pod"""
         try:
-            # Build the kubectl command
-            cmd = ["kubectl", "exec", pod_name, "-n", namespace]
-            if container:
-                cmd.extend(["-c", container])
-            cmd.extend(["--"] + command)
-            
-            # Execute the command
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            # Exec over the manager's websocket client instead of forking
+            # kubectl, which reloads kubeconfig and redoes discovery each time
+            ws_api = async_client.CoreV1Api(k8s_manager.get_ws_client())
+            exec_kwargs = {"container": container} if container else {}
+            connection = await ws_api.connect_get_namespaced_pod_exec(
+                pod_name,
+                namespace,
+                command=command,
+                stdout=True,
+                stderr=True,
+                stdin=False,
+                tty=False,
+                _preload_content=False,
+                **exec_kwargs
             )
             
-            stdout, stderr = await process.communicate()
+            stdout, stderr = [], []
+            exit_code = 0
+            async with connection as ws:
+                async for message in ws:
+                    data = message.data
+                    if not data:
+                        continue
+                    channel, payload = data[0], data[1:].decode("utf-8", "replace")
+                    if channel == STDOUT_CHANNEL:
+                        stdout.append(payload)
+                    elif channel == STDERR_CHANNEL:
+                        stderr.append(payload)
+                    elif channel == ERROR_CHANNEL and payload:
+                        try:
+                            exit_code = WsApiClient.parse_error_data(payload)
+                        except (KeyError, IndexError, ValueError):
+                            # A failure status without an exit code, e.g. an unknown container
+                            return f"Error: {payload}"
             
-            if process.returncode != 0:
-                return f"Error: {stderr.decode()}"
+            if exit_code != 0:
+                return f"Error: {''.join(stderr)}"
             
-            return stdout.decode()
+            return "".join(stdout)
         except Exception as e:
             return f"Error executing command in pod: {e}"
 
@@ -285,13 +371,25 @@ def register_pod_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         label_selector: Optional[str] = None
     ) -> str:
         """Get pod metrics (requires metrics-server)"""
-        args = ["top", "pods"]
-        if namespace:
-            args.extend(["-n", namespace])
-        else:
-            args.append("--all-namespaces")
-            
-        if label_selector:
-            args.extend(["-l", label_selector])
-            
-        return await run_kubectl_command(*args) 
\ No newline at end of file
+        try:
+            custom_objects_api = k8s_manager.get_custom_objects_api()
+            if namespace:
+                response = await k8s_manager.call(
+                    custom_objects_api.list_namespaced_custom_object,
+                    "metrics.k8s.io",
+                    "v1beta1",
+                    namespace,
+                    "pods",
+                    label_selector=label_selector
+                )
+            else:
+                response = await k8s_manager.call(
+                    custom_objects_api.list_cluster_custom_object,
+                    "metrics.k8s.io",
+                    "v1beta1",
+                    "pods",
+                    label_selector=label_selector
+                )
+            return serialize_response(k8s_manager.get_api_client(), response)
+        except ApiException as e:
+            return f"Error getting pod metrics: {e}" 
\ No newline at end of file
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+import aiohttp
+from kubernetes_asyncio import client
+from kubernetes_asyncio.stream import WsApiClient
+
+# Forwarded ports listen on loopback only, as kubectl port-forward does
+LOCAL_HOST = "127.0.0.1"
+
+# Bytes read from a local connection per websocket frame
+CHUNK_SIZE = 64 * 1024
+
+# Each forwarded port gets a data and an error channel; the first frame on
+# each carries the port number, which is stripped before relaying
+DATA_CHANNEL = 0
+ERROR_CHANNEL = 1
+PORT_PREFIX_SIZE = 2
+
+class PortForward:
+    """Local TCP listener that relays each connection to a service's pod
+    
+    The backing pod is resolved from the service's endpoints for every new
+    connection, so the forward survives pod restarts and rollouts.
+    """
+
+    def __init__(
+        self,
+        core_api: client.CoreV1Api,
+        ws_client: WsApiClient,
+        service_name: str,
+        namespace: str,
+        remote_port: int
+    ):
+        self._core_api = core_api
+        self._ws_api = client.CoreV1Api(ws_client)
+        self.service_name = service_name
+        self.namespace = namespace
+        self.remote_port = remote_port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, local_port: int) -> None:
+        """Resolve the service once, failing early if it has no ready pod, then listen"""
+        await self._resolve()
+        self._server = await asyncio.start_server(self._handle, LOCAL_HOST, local_port)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _resolve(self) -> Tuple[str, int]:
+        """Return a ready pod behind the service and the container port to reach"""
+        service = await self._core_api.read_namespaced_service(self.service_name, self.namespace)
+        endpoints = await self._core_api.read_namespaced_endpoints(self.service_name, self.namespace)
+        
+        # remote_port is a service port, as with kubectl; the endpoint port
+        # sharing its name is the container port behind it
+        port_name = next(
+            (port.name for port in service.spec.ports or () if port.port == self.remote_port),
+            None
+        )
+        for subset in endpoints.subsets or ():
+            addresses = [address for address in subset.addresses or () if address.target_ref]
+            if not addresses:
+                continue
+            ports = subset.ports or ()
+            target_port = next(
+                (port.port for port in ports if port.name == port_name),
+                ports[0].port if len(ports) == 1 else self.remote_port
+            )
+            return addresses[0].target_ref.name, target_port
+        raise RuntimeError(f"service {self.service_name} has no ready pods")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            pod_name, target_port = await self._resolve()
+            connection = await self._ws_api.connect_get_namespaced_pod_portforward(
+                pod_name,
+                self.namespace,
+                ports=target_port,
+                _preload_content=False
+            )
+            async with connection as ws:
+                async def send_local() -> None:
+                    while data := await reader.read(CHUNK_SIZE):
+                        await ws.send_bytes(bytes((DATA_CHANNEL,)) + data)
+                    # The local side is done; closing ends the receive loop
+                    await ws.close()
+                
+                sender = asyncio.create_task(send_local())
+                try:
+                    prefixed = {DATA_CHANNEL, ERROR_CHANNEL}
+                    async for message in ws:
+                        if message.type != aiohttp.WSMsgType.BINARY or not message.data:
+                            continue
+                        channel, payload = message.data[0], message.data[1:]
+                        if channel in prefixed:
+                            prefixed.discard(channel)
+                            payload = payload[PORT_PREFIX_SIZE:]
+                        if not payload:
+                            continue
+                        if channel == ERROR_CHANNEL:
+                            logging.warning(
+                                f"Port forward to {self.namespace}/{pod_name}:{target_port} failed: "
+                                f"{payload.decode('utf-8', 'replace')}"
+                            )
+                            break
+                        writer.write(payload)
+                        await writer.drain()
+                finally:
+                    sender.cancel()
+        except Exception as e:
+            logging.warning(f"Port forward for service {self.namespace}/{self.service_name} failed: {e}")
+        finally:
+            writer.close()
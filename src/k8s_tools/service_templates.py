@@ -1,5 +1,6 @@
 from enum import Enum
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
+from typing_extensions import Required, TypedDict
 
 class ServiceType(Enum):
     CLUSTER_IP = "ClusterIP"
@@ -7,9 +8,12 @@ class ServiceType(Enum):
     LOAD_BALANCER = "LoadBalancer"
     EXTERNAL_NAME = "ExternalName"
 
+# Service types by their API value ("ClusterIP")
+TEMPLATE_LOOKUP: Dict[str, ServiceType] = {t.value: t for t in ServiceType}
+
 class PortConfig(TypedDict, total=False):
-    port: int
-    targetPort: int
+    port: Required[int]
+    targetPort: Union[int, str]
     nodePort: Optional[int]
     protocol: str
     name: str
@@ -1,55 +1,166 @@
-from typing import Dict, Any, List, Optional
+import io
+from collections import ChainMap
+from typing import Callable, Dict, Any, List, Mapping, Optional
 from mcp.server.fastmcp import FastMCP, Context
-from kubernetes.client import (
-    V1Service,
-    V1ServiceSpec,
-    V1ServicePort,
-    V1ObjectMeta
-)
-from kubernetes.client.rest import ApiException
+from kubernetes_asyncio.client.rest import ApiException
+import orjson
+import yaml
 
 from .k8s_manager import KubernetesManager
+from .port_forward import LOCAL_HOST
 from .service_templates import (
     ServiceType,
+    TEMPLATE_LOOKUP,
     service_templates,
     ServiceConfig,
     PortConfig
 )
 
+# Separator between services in list output
+SERVICE_SEPARATOR = "-" * 50
+
+# libyaml's emitter when PyYAML was built with it, the pure-Python one otherwise
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+def _without_none(fields: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in fields.items() if value is not None}
+
+def _port_manifest(port: Mapping[str, Any]) -> Dict[str, Any]:
+    return _without_none({
+        "port": port["port"],
+        "targetPort": port.get("targetPort"),
+        "nodePort": port.get("nodePort"),
+        "protocol": port.get("protocol", "TCP"),
+        "name": port.get("name")
+    })
+
+# Template port lists in manifest form, built once per service type
+_TEMPLATE_PORTS: Dict[ServiceType, List[Dict[str, Any]]] = {
+    service_type: [_port_manifest(port) for port in config["ports"]]
+    for service_type, config in service_templates.items()
+}
+
+def _summarize_service(service: Dict[str, Any]) -> Dict[str, Any]:
+    """Project the fields a caller acts on from a service in API JSON form"""
+    metadata = service.get("metadata") or {}
+    spec = service.get("spec") or {}
+    ingress = ((service.get("status") or {}).get("loadBalancer") or {}).get("ingress")
+    return _without_none({
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "type": spec.get("type"),
+        "clusterIP": spec.get("clusterIP"),
+        "externalIPs": spec.get("externalIPs"),
+        "externalName": spec.get("externalName"),
+        "loadBalancerIngress": [
+            entry.get("ip") or entry.get("hostname") for entry in ingress
+        ] if ingress else None,
+        "ports": [
+            _without_none({
+                "name": port.get("name"),
+                "port": port.get("port"),
+                "targetPort": port.get("targetPort"),
+                "nodePort": port.get("nodePort"),
+                "protocol": port.get("protocol")
+            })
+            for port in spec.get("ports") or ()
+        ],
+        "selector": spec.get("selector")
+    })
+
+def _summarize_endpoints(endpoints: Dict[str, Any]) -> Dict[str, Any]:
+    """Project endpoint addresses and ports, one entry per subset"""
+    metadata = endpoints.get("metadata") or {}
+    return {
+        "name": metadata.get("name"),
+        "namespace": metadata.get("namespace"),
+        "subsets": [
+            _without_none({
+                "addresses": [
+                    address.get("ip") for address in subset["addresses"]
+                ] if subset.get("addresses") else None,
+                "notReadyAddresses": [
+                    address.get("ip") for address in subset["notReadyAddresses"]
+                ] if subset.get("notReadyAddresses") else None,
+                "ports": [
+                    _without_none({"name": port.get("name"), "port": port.get("port"), "protocol": port.get("protocol")})
+                    for port in subset.get("ports") or ()
+                ]
+            })
+            for subset in endpoints.get("subsets") or ()
+        ]
+    }
+
+def _dump(summary: Dict[str, Any]) -> str:
+    return yaml.dump(summary, Dumper=_YAML_DUMPER, sort_keys=False)
+
+def write_service_info(write: Callable[[str], Any], service: Dict[str, Any]) -> None:
+    """Write a service, in API JSON form, through `write` (e.g. a StringIO's write)"""
+    metadata = service.get("metadata") or {}
+    spec = service.get("spec") or {}
+    write(
+        f"Service: {metadata.get('name')}"
+        f"\nNamespace: {metadata.get('namespace')}"
+        f"\nType: {spec.get('type')}"
+        "\nPorts:"
+    )
+    # ExternalName services have no ports
+    for port in spec.get("ports") or ():
+        write(f"\n  - {port.get('port')} -> {port.get('targetPort')}")
+
 def register_service_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all service-related tools with the MCP server"""
     
+    # Service listings read from the API and error responses for names the API
+    # server reported missing. Both live on the manager, so every tool that
+    # writes Services invalidates them.
+    read_cache = k8s_manager.get_service_cache()
+    not_found_cache = k8s_manager.get_service_not_found_cache()
+    
     @mcp.tool()
     async def get_services(
         namespace: Optional[str] = None,
         label_selector: Optional[str] = None
     ) -> str:
         """Get services with optional filtering"""
-        try:
+        def render(services: List[Dict[str, Any]]) -> str:
+            if not services:
+                return "No services found"
+            
+            buf = io.StringIO()
+            write = buf.write
+            for i, service in enumerate(services):
+                if i:
+                    write("\n")
+                write_service_info(write, service)
+                write(f"\n{SERVICE_SEPARATOR}")
+            return buf.getvalue()
+        
+        async def load() -> str:
+            # Only a few fields are rendered, so read them from the raw
+            # JSON rather than deserializing whole service models
             if namespace:
-                response = k8s_manager.get_core_api().list_namespaced_service(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_core_api().list_namespaced_service,
                     namespace,
                     label_selector=label_selector
                 )
             else:
-                response = k8s_manager.get_core_api().list_service_for_all_namespaces(
+                response = await k8s_manager.call_raw(
+                    k8s_manager.get_core_api().list_service_for_all_namespaces,
                     label_selector=label_selector
                 )
-            
-            if not response.items:
-                return "No services found"
-            
-            result = []
-            for service in response.items:
-                result.append(f"Service: {service.metadata.name}")
-                result.append(f"Namespace: {service.metadata.namespace}")
-                result.append(f"Type: {service.spec.type}")
-                result.append("Ports:")
-                for port in service.spec.ports:
-                    result.append(f"  - {port.port} -> {port.target_port}")
-                result.append("-" * 50)
-            
-            return "\n".join(result)
+            return render(orjson.loads(response).get("items") or [])
+        
+        # The watch cache follows every write, including ones made outside
+        # these tools; the TTL cache only covers reads until it is ready
+        cached = k8s_manager.get_state_cache().services.list(namespace, label_selector)
+        if cached is not None:
+            api_client = k8s_manager.get_api_client()
+            return render([api_client.sanitize_for_serialization(service) for service in cached])
+        
+        try:
+            return await read_cache.get_or_load(("get_services", namespace, label_selector), load)
         except ApiException as e:
             return f"Error getting services: {e}"
 
@@ -59,13 +170,28 @@ def register_service_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         namespace: str
     ) -> str:
         """Describe a specific service"""
+        key = ("describe_service", namespace, service_name)
+        not_found = not_found_cache.get(key)
+        if not_found is not None:
+            return not_found
+        # A 404 is only remembered if no Service was written during the read
+        generation = not_found_cache.get_generation()
         try:
-            response = await k8s_manager.get_core_api().read_namespaced_service(
-                service_name,
-                namespace
-            )
-            return str(response)
+            # The watch cache holds services by (namespace, name), the same
+            # snapshot get_services lists from
+            cached = k8s_manager.get_state_cache().services.get(service_name, namespace)
+            if cached is not None:
+                service = k8s_manager.get_api_client().sanitize_for_serialization(cached)
+            else:
+                service = orjson.loads(await k8s_manager.call_raw(
+                    k8s_manager.get_core_api().read_namespaced_service,
+                    service_name,
+                    namespace
+                ))
+            return _dump(_summarize_service(service))
         except ApiException as e:
+            if e.status == 404:
+                not_found_cache.set(key, f"Error describing service: {e}", generation)
             return f"Error describing service: {e}"
 
     @mcp.tool()
@@ -73,74 +199,66 @@ def register_service_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         name: str,
         namespace: str,
         service_type: str,
-        ports: Optional[List[Dict[str, Any]]] = None,
+        ports: Optional[List[PortConfig]] = None,
         selector: Optional[Dict[str, str]] = None,
         custom_config: Optional[ServiceConfig] = None
     ) -> str:
         """Create a new service using a template"""
-        try:
-            type_enum = ServiceType(service_type)
-        except ValueError:
+        type_enum = TEMPLATE_LOOKUP.get(service_type)
+        if type_enum is None:
             return f"Invalid service type. Must be one of: {', '.join(t.name for t in ServiceType)}"
         
         template_config = service_templates[type_enum]
         
-        # If using custom config, validate and merge
-        service_config: Dict[str, Any]
+        # Custom settings shadow the template through a view rather than a
+        # merged copy; template ports are used as prebuilt
+        service_config: Mapping[str, Any]
         if custom_config:
-            service_config = {
-                **template_config,
-                **custom_config
-            }
-        else:
-            service_config = {
-                **template_config,
-                "ports": ports or template_config["ports"],
-                "selector": selector or template_config["selector"]
-            }
-        
-        # Create service ports
-        service_ports = [
-            V1ServicePort(
-                port=port["port"],
-                target_port=port["targetPort"],
-                node_port=port.get("nodePort"),
-                protocol=port.get("protocol", "TCP"),
-                name=port.get("name")
+            service_config = ChainMap(custom_config, template_config)
+            service_ports = (
+                [_port_manifest(port) for port in custom_config["ports"]]
+                if "ports" in custom_config else _TEMPLATE_PORTS[type_enum]
             )
-            for port in service_config["ports"]
-        ]
+            service_selector = service_config.get("selector")
+        else:
+            service_config = template_config
+            service_ports = [_port_manifest(port) for port in ports] if ports else _TEMPLATE_PORTS[type_enum]
+            service_selector = selector or template_config.get("selector")
         
-        # Create service object
-        service = V1Service(
-            api_version="v1",
-            kind="Service",
-            metadata=V1ObjectMeta(
-                name=name,
-                namespace=namespace,
-                labels={
+        # The body is built as a plain v1 manifest; the client sends dicts
+        # as-is instead of validating and re-serializing V1* models
+        service = {
+            "apiVersion": "v1",
+            "kind": "Service",
+            "metadata": {
+                "name": name,
+                "namespace": namespace,
+                "labels": {
                     "mcp-managed": "true",
                     "app": name
                 }
-            ),
-            spec=V1ServiceSpec(
-                type=service_config["type"],
-                ports=service_ports,
-                selector=service_config["selector"],
-                external_ips=service_config.get("externalIPs"),
-                load_balancer_ip=service_config.get("loadBalancerIP"),
-                session_affinity=service_config.get("sessionAffinity"),
-                external_traffic_policy=service_config.get("externalTrafficPolicy")
-            )
-        )
+            },
+            "spec": _without_none({
+                "type": service_config["type"],
+                "ports": service_ports,
+                "selector": service_selector,
+                "externalName": service_config.get("externalName") or None,
+                "externalIPs": service_config.get("externalIPs"),
+                "loadBalancerIP": service_config.get("loadBalancerIP"),
+                "sessionAffinity": service_config.get("sessionAffinity"),
+                "externalTrafficPolicy": service_config.get("externalTrafficPolicy")
+            })
+        }
         
         try:
-            response = await k8s_manager.get_core_api().create_namespaced_service(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_core_api().create_namespaced_service,
                 namespace,
                 service
             )
             k8s_manager.track_resource("Service", name, namespace)
-            return str(response)
+            k8s_manager.invalidate_services(namespace)
+            return _dump(_summarize_service(orjson.loads(response)))
         except ApiException as e:
             return f"Error creating service: {e}"
 
@@ -149,36 +267,30 @@ def register_service_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         service_name: str,
         namespace: str,
         service_type: Optional[str] = None,
-        ports: Optional[List[Dict[str, Any]]] = None,
+        ports: Optional[List[PortConfig]] = None,
         selector: Optional[Dict[str, str]] = None
     ) -> str:
         """Update a service's configuration"""
         try:
-            patch = {}
+            spec: Dict[str, Any] = {}
             if service_type:
-                patch["spec"] = {"type": service_type}
+                spec["type"] = service_type
             if ports:
-                patch["spec"] = {
-                    "ports": [
-                        {
-                            "port": p["port"],
-                            "targetPort": p["targetPort"],
-                            "nodePort": p.get("nodePort"),
-                            "protocol": p.get("protocol", "TCP"),
-                            "name": p.get("name")
-                        }
-                        for p in ports
-                    ]
-                }
+                # A merge patch replaces the whole port list, and a null
+                # field would delete it, so unset optional fields are left out
+                spec["ports"] = [_port_manifest(port) for port in ports]
             if selector:
-                patch["spec"] = {"selector": selector}
+                spec["selector"] = selector
                 
-            response = await k8s_manager.get_core_api().patch_namespaced_service(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_core_api().patch_namespaced_service,
                 service_name,
                 namespace,
-                patch
+                {"spec": spec},
+                _content_type="application/merge-patch+json"
             )
-            return str(response)
+            k8s_manager.invalidate_services(namespace)
+            return _dump(_summarize_service(orjson.loads(response)))
         except ApiException as e:
             return f"Error updating service: {e}"
 
@@ -190,11 +302,13 @@ def register_service_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     ) -> str:
         """Delete a service"""
         try:
-            response = await k8s_manager.get_core_api().delete_namespaced_service(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_core_api().delete_namespaced_service,
                 service_name,
                 namespace
             )
-            return str(response)
+            k8s_manager.invalidate_services(namespace)
+            return _dump(_summarize_service(orjson.loads(response)))
         except ApiException as e:
             return f"Error deleting service: {e}"
 
@@ -204,13 +318,21 @@ def register_service_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         namespace: str
     ) -> str:
         """Get endpoints for a service"""
+        key = ("get_service_endpoints", namespace, service_name)
+        not_found = not_found_cache.get(key)
+        if not_found is not None:
+            return not_found
+        generation = not_found_cache.get_generation()
         try:
-            response = await k8s_manager.get_core_api().read_namespaced_endpoints(
+            response = await k8s_manager.call_raw(
+                k8s_manager.get_core_api().read_namespaced_endpoints,
                 service_name,
                 namespace
             )
-            return str(response)
+            return _dump(_summarize_endpoints(orjson.loads(response)))
         except ApiException as e:
+            if e.status == 404:
+                not_found_cache.set(key, f"Error getting service endpoints: {e}", generation)
             return f"Error getting service endpoints: {e}"
 
     @mcp.tool()
@@ -221,7 +343,16 @@ def register_service_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
         remote_port: int
     ) -> str:
         """Forward a local port to a service"""
-        return await run_kubectl_command(
-            "port-forward",
-            ["service", service_name, f"{local_port}:{remote_port}", "-n", namespace]
-        ) 
\ No newline at end of file
+        # The forward keeps running in the server after this call returns
+        try:
+            _, started = await k8s_manager.start_port_forward(
+                service_name,
+                namespace,
+                local_port,
+                remote_port
+            )
+        except (ApiException, OSError, RuntimeError) as e:
+            return f"Error forwarding port: {e}"
+        if not started:
+            return f"Already forwarding {LOCAL_HOST}:{local_port} -> service/{service_name}:{remote_port}"
+        return f"Forwarding {LOCAL_HOST}:{local_port} -> service/{service_name}:{remote_port}" 
\ No newline at end of file
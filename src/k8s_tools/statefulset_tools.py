@@ -1,9 +1,12 @@
 from typing import Dict, Any, List, Optional
 from mcp.server.fastmcp import FastMCP, Context
+from kubernetes_asyncio import client
+from kubernetes_asyncio.client.rest import ApiException
 
-from .pod_tools import run_kubectl_command
+from .cluster_tools import serialize_response
+from .k8s_manager import KubernetesManager
 
-def register_statefulset_tools(mcp: FastMCP):
+def register_statefulset_tools(mcp: FastMCP, k8s_manager: KubernetesManager):
     """Register all statefulset and replica set related tools with the MCP server"""
     
     @mcp.tool()
@@ -13,17 +16,25 @@ def register_statefulset_tools(mcp: FastMCP):
         output: str = "json"
     ) -> str:
         """Get statefulsets with optional filtering and output format"""
-        args = ["statefulsets"]
-        if namespace:
-            args.extend(["-n", namespace])
-        else:
-            args.append("--all-namespaces")
-        
-        if label_selector:
-            args.extend(["-l", label_selector])
-        
-        args.extend(["-o", output])
-        return await run_kubectl_command("get", args)
+        try:
+            statefulsets = k8s_manager.get_state_cache().statefulsets.list(namespace, label_selector)
+            if statefulsets is None:
+                if namespace:
+                    response = await k8s_manager.call(
+                        k8s_manager.get_apps_api().list_namespaced_stateful_set,
+                        namespace,
+                        label_selector=label_selector
+                    )
+                else:
+                    response = await k8s_manager.call(
+                        k8s_manager.get_apps_api().list_stateful_set_for_all_namespaces,
+                        label_selector=label_selector
+                    )
+            else:
+                response = client.V1StatefulSetList(api_version="apps/v1", kind="StatefulSetList", items=statefulsets)
+            return serialize_response(k8s_manager.get_api_client(), response, output)
+        except ApiException as e:
+            return f"Error getting statefulsets: {e}"
 
     @mcp.tool()
     async def describe_statefulset(
@@ -32,10 +43,17 @@ def register_statefulset_tools(mcp: FastMCP):
         output: str = "yaml"
     ) -> str:
         """Describe a specific statefulset"""
-        return await run_kubectl_command(
-            "describe",
-            ["statefulset", statefulset_name, "-n", namespace, "-o", output]
-        )
+        try:
+            response = k8s_manager.get_state_cache().statefulsets.get(statefulset_name, namespace)
+            if response is None:
+                response = await k8s_manager.call(
+                    k8s_manager.get_apps_api().read_namespaced_stateful_set,
+                    statefulset_name,
+                    namespace
+                )
+            return serialize_response(k8s_manager.get_api_client(), response, output)
+        except ApiException as e:
+            return f"Error describing statefulset: {e}"
 
     @mcp.tool()
     async def create_statefulset(
@@ -48,19 +66,39 @@ def register_statefulset_tools(mcp: FastMCP):
         volume_claim_templates: Optional[List[Dict[str, Any]]] = None
     ) -> str:
         """Create a new statefulset"""
-        args = ["create", "statefulset", name, "-n", namespace]
+        # The body is a plain apps/v1 manifest, so volume claim templates
+        # given as dicts are sent as-is
+        pod_labels = {"app": name}
+        statefulset = {
+            "apiVersion": "apps/v1",
+            "kind": "StatefulSet",
+            "metadata": {
+                "name": name,
+                "namespace": namespace,
+                "labels": {**(labels or {}), "mcp-managed": "true", "app": name}
+            },
+            "spec": {
+                "replicas": replicas,
+                "serviceName": service_name or name,
+                "selector": {"matchLabels": pod_labels},
+                "template": {
+                    "metadata": {"labels": pod_labels},
+                    "spec": {"containers": [{"name": name, "image": image}]}
+                }
+            }
+        }
+        if volume_claim_templates:
+            statefulset["spec"]["volumeClaimTemplates"] = volume_claim_templates
         
-        if image:
-            args.extend(["--image", image])
-        if replicas:
-            args.extend(["--replicas", str(replicas)])
-        if labels:
-            label_str = ",".join(f"{k}={v}" for k, v in labels.items())
-            args.extend(["--labels", label_str])
-        if service_name:
-            args.extend(["--service-name", service_name])
-            
-        return await run_kubectl_command(*args)
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_apps_api().create_namespaced_stateful_set,
+                namespace,
+                statefulset
+            )
+            return f"StatefulSet {name} created successfully"
+        except ApiException as e:
+            return f"Error creating statefulset: {e}"
 
     @mcp.tool()
     async def scale_statefulset(
@@ -69,10 +107,16 @@ def register_statefulset_tools(mcp: FastMCP):
         replicas: int
     ) -> str:
         """Scale a statefulset to a specific number of replicas"""
-        return await run_kubectl_command(
-            "scale",
-            ["statefulset", statefulset_name, "-n", namespace, f"--replicas={replicas}"]
-        )
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_apps_api().patch_namespaced_stateful_set_scale,
+                statefulset_name,
+                namespace,
+                {"spec": {"replicas": replicas}}
+            )
+            return f"StatefulSet {statefulset_name} scaled to {replicas} replicas"
+        except ApiException as e:
+            return f"Error scaling statefulset: {e}"
 
     @mcp.tool()
     async def delete_statefulset(
@@ -81,12 +125,17 @@ def register_statefulset_tools(mcp: FastMCP):
         force: bool = False
     ) -> str:
         """Delete a statefulset"""
-        args = ["delete", "statefulset", statefulset_name, "-n", namespace]
-        
-        if force:
-            args.append("--force")
-            
-        return await run_kubectl_command(*args)
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_apps_api().delete_namespaced_stateful_set,
+                statefulset_name,
+                namespace,
+                grace_period_seconds=0 if force else None,
+                propagation_policy="Foreground"
+            )
+            return f"StatefulSet {statefulset_name} deleted successfully"
+        except ApiException as e:
+            return f"Error deleting statefulset: {e}"
 
     @mcp.tool()
     async def get_replicasets(
@@ -95,17 +144,21 @@ def register_statefulset_tools(mcp: FastMCP):
         output: str = "json"
     ) -> str:
         """Get replicasets with optional filtering and output format"""
-        args = ["replicasets"]
-        if namespace:
-            args.extend(["-n", namespace])
-        else:
-            args.append("--all-namespaces")
-        
-        if label_selector:
-            args.extend(["-l", label_selector])
-        
-        args.extend(["-o", output])
-        return await run_kubectl_command("get", args)
+        try:
+            if namespace:
+                response = await k8s_manager.call(
+                    k8s_manager.get_apps_api().list_namespaced_replica_set,
+                    namespace,
+                    label_selector=label_selector
+                )
+            else:
+                response = await k8s_manager.call(
+                    k8s_manager.get_apps_api().list_replica_set_for_all_namespaces,
+                    label_selector=label_selector
+                )
+            return serialize_response(k8s_manager.get_api_client(), response, output)
+        except ApiException as e:
+            return f"Error getting replicasets: {e}"
 
     @mcp.tool()
     async def describe_replicaset(
@@ -114,10 +167,15 @@ def register_statefulset_tools(mcp: FastMCP):
         output: str = "yaml"
     ) -> str:
         """Describe a specific replicaset"""
-        return await run_kubectl_command(
-            "describe",
-            ["replicaset", replicaset_name, "-n", namespace, "-o", output]
-        )
+        try:
+            response = await k8s_manager.call(
+                k8s_manager.get_apps_api().read_namespaced_replica_set,
+                replicaset_name,
+                namespace
+            )
+            return serialize_response(k8s_manager.get_api_client(), response, output)
+        except ApiException as e:
+            return f"Error describing replicaset: {e}"
 
     @mcp.tool()
     async def scale_replicaset(
@@ -126,10 +184,16 @@ def register_statefulset_tools(mcp: FastMCP):
         replicas: int
     ) -> str:
         """Scale a replicaset to a specific number of replicas"""
-        return await run_kubectl_command(
-            "scale",
-            ["replicaset", replicaset_name, "-n", namespace, f"--replicas={replicas}"]
-        )
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_apps_api().patch_namespaced_replica_set_scale,
+                replicaset_name,
+                namespace,
+                {"spec": {"replicas": replicas}}
+            )
+            return f"ReplicaSet {replicaset_name} scaled to {replicas} replicas"
+        except ApiException as e:
+            return f"Error scaling replicaset: {e}"
 
     @mcp.tool()
     async def delete_replicaset(
@@ -138,9 +202,14 @@ def register_statefulset_tools(mcp: FastMCP):
         force: bool = False
     ) -> str:
         """Delete a replicaset"""
-        args = ["delete", "replicaset", replicaset_name, "-n", namespace]
-        
-        if force:
-            args.append("--force")
-            
-        return await run_kubectl_command(*args) 
\ No newline at end of file
+        try:
+            await k8s_manager.call(
+                k8s_manager.get_apps_api().delete_namespaced_replica_set,
+                replicaset_name,
+                namespace,
+                grace_period_seconds=0 if force else None,
+                propagation_policy="Foreground"
+            )
+            return f"ReplicaSet {replicaset_name} deleted successfully"
+        except ApiException as e:
+            return f"Error deleting replicaset: {e}"
\ No newline at end of file
@@ -0,0 +1,113 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+# Seconds a cached read stays fresh. Deployments, ingresses and the like
+# change on a seconds-to-minutes cadence, so a few seconds is safe.
+DEFAULT_TTL = 3.0
+
+# Maximum entries kept per cache before the oldest are evicted
+DEFAULT_MAXSIZE = 512
+
+def _covers(key_namespace: Any, namespace: str) -> bool:
+    if isinstance(key_namespace, tuple):
+        return namespace in key_namespace
+    return key_namespace in (namespace, None)
+
+class TTLCache:
+    """Short-lived cache for read-only tool responses
+
+    Keys are tuples of (tool name, namespace, ...). Concurrent misses for the
+    same key share a single load, so identical calls issued together cost one
+    API request. The load runs as its own task, so cancelling one caller does
+    not cancel it for the others.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, maxsize: int = DEFAULT_MAXSIZE):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self._generation = 0
+
+    async def get_or_load(self, key: Tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling loader on a miss
+
+        Exceptions raised by loader propagate and are not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, self._generation))
+            task.add_done_callback(self._load_done)
+            self._pending[key] = task
+        return await asyncio.shield(task)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Return the cached value for key, or None if it is missing or expired"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def set(self, key: Tuple, value: Any, generation: Optional[int] = None) -> None:
+        """Cache value for key, as a completed load would
+
+        With a generation taken from get_generation() before the value was
+        read, the value is dropped if the cache has been invalidated since.
+        """
+        if generation is None or generation == self._generation:
+            self._store(key, value)
+
+    def get_generation(self) -> int:
+        """Return a token that changes whenever the cache is invalidated"""
+        return self._generation
+
+    def invalidate(self, namespace: Optional[str] = None) -> None:
+        """Drop entries for a namespace, plus all-namespace entries
+
+        An entry whose namespace is a tuple covers several namespaces and is
+        dropped when any of them changes. With no namespace, every entry is
+        dropped.
+        """
+        self._generation += 1
+        if namespace is None:
+            self._entries.clear()
+            self._pending.clear()
+            return
+        for key in [key for key in self._entries if _covers(key[1], namespace)]:
+            del self._entries[key]
+        # Loads started before the write may return stale data, so later
+        # reads start their own instead of joining them
+        for key in [key for key in self._pending if _covers(key[1], namespace)]:
+            del self._pending[key]
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        try:
+            value = await loader()
+        finally:
+            if self._pending.get(key) is asyncio.current_task():
+                del self._pending[key]
+        # A write that invalidated the cache mid-load makes this value stale
+        if generation == self._generation:
+            self._store(key, value)
+        return value
+
+    @staticmethod
+    def _load_done(task: asyncio.Task) -> None:
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        if len(self._entries) >= self._maxsize:
+            now = time.monotonic()
+            for stale in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[stale]
+            while len(self._entries) >= self._maxsize:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + self._ttl, value)
@@ -1,18 +1,132 @@
+import asyncio
+import orjson
 import yaml
-from typing import Optional
-from kubernetes.client.rest import ApiException
-from kubernetes.client import ApiClient
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from kubernetes_asyncio.client.rest import ApiException
 
 from .k8s_manager import KubernetesManager
 
+# libyaml's parser when PyYAML was built with it, the pure-Python one otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Resources of one apply_yaml call written at once, so a large manifest
+# leaves the rest of the shared in-flight slots to other tool calls
+APPLY_CONCURRENCY = 8
+
+# Objects fetched per list request when checking which already exist
+LIST_PAGE_SIZE = 500
+
+@dataclass(slots=True, frozen=True)
+class _Handler:
+    """API methods that apply one namespaced resource kind"""
+    api: Callable[[KubernetesManager], Any]
+    list: str
+    replace: str
+    create: str
+
+# Kinds apply_yaml can apply; a new kind only needs an entry here
+HANDLERS: Dict[str, _Handler] = {
+    "ConfigMap": _Handler(
+        KubernetesManager.get_core_api,
+        "list_namespaced_config_map",
+        "replace_namespaced_config_map",
+        "create_namespaced_config_map"
+    )
+}
+
+async def _existing_names(
+    k8s_manager: KubernetesManager,
+    handler: _Handler,
+    namespace: str
+) -> Optional[Set[str]]:
+    """Names of a kind's objects in a namespace, or None if they can't be listed"""
+    list_func = getattr(handler.api(k8s_manager), handler.list)
+    names = set()
+    continue_token = None
+    try:
+        while True:
+            response = await k8s_manager.call_raw(
+                list_func,
+                namespace,
+                limit=LIST_PAGE_SIZE,
+                _continue=continue_token
+            )
+            page = orjson.loads(response)
+            names.update(item["metadata"]["name"] for item in page.get("items") or ())
+            
+            continue_token = (page.get("metadata") or {}).get("continue")
+            if not continue_token:
+                return names
+    except ApiException:
+        # e.g. RBAC allows writing the kind but not listing it
+        return None
+
+async def _apply_resource(
+    k8s_manager: KubernetesManager,
+    resource: Dict[str, Any],
+    namespace: Optional[str],
+    existing: Dict[Tuple[str, str], asyncio.Future]
+) -> str:
+    """Apply a single parsed resource and describe the outcome
+    
+    existing maps each (kind, namespace) to one shared listing of the names
+    already there, started by the first resource that needs it.
+    """
+    kind = resource["kind"]
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        return f"Unsupported resource kind: {kind}"
+    
+    if namespace:
+        resource["metadata"]["namespace"] = namespace
+    name = resource["metadata"]["name"]
+    resource_namespace = resource["metadata"]["namespace"]
+    
+    key = (kind, resource_namespace)
+    names = existing.get(key)
+    if names is None:
+        names = existing[key] = asyncio.ensure_future(
+            _existing_names(k8s_manager, handler, resource_namespace)
+        )
+    names = await asyncio.shield(names)
+    
+    api = handler.api(k8s_manager)
+    replace = getattr(api, handler.replace)
+    if names is None or name in names:
+        try:
+            await k8s_manager.call(replace, name, resource_namespace, resource)
+            return f"{kind} {name} updated successfully"
+        except ApiException as e:
+            # Deleted since it was listed, or not listable at all
+            if e.status != 404:
+                raise
+    
+    try:
+        await k8s_manager.call(getattr(api, handler.create), resource_namespace, resource)
+        return f"{kind} {name} created successfully"
+    except ApiException as e:
+        # Created since it was listed, e.g. by an earlier document
+        if e.status != 409:
+            raise
+    
+    await k8s_manager.call(replace, name, resource_namespace, resource)
+    return f"{kind} {name} updated successfully"
+
 async def apply_yaml(
+    k8s_manager: KubernetesManager,
     yaml_content: str,
     namespace: Optional[str] = None,
     force: bool = False
 ) -> str:
     """Apply YAML content to the Kubernetes cluster
     
+    Each document is sent to the API as soon as it is parsed, so applying
+    overlaps with parsing the rest. A resource that fails is reported in its
+    place without stopping the others; a parse error stops at that document.
+    
     Args:
+        k8s_manager: The shared Kubernetes manager
         yaml_content: The YAML content to apply
         namespace: Optional namespace to apply the YAML in
         force: Whether to force the apply operation
@@ -20,47 +134,37 @@ async def apply_yaml(
     Returns:
         str: The result of the apply operation
     """
+    semaphore = asyncio.Semaphore(APPLY_CONCURRENCY)
+    tasks = []
+    existing: Dict[Tuple[str, str], asyncio.Future] = {}
+    
+    async def apply_one(resource: Dict[str, Any]) -> str:
+        async with semaphore:
+            return await _apply_resource(k8s_manager, resource, namespace, existing)
+    
+    parse_error = None
     try:
-        # Parse the YAML content
-        resources = yaml.safe_load_all(yaml_content)
-        
-        results = []
-        for resource in resources:
+        for resource in yaml.load_all(yaml_content, Loader=_YAML_LOADER):
             if not resource:
                 continue
-                
-            # Get the appropriate API client based on the resource type
-            api_client = None
-            if resource["kind"] == "ConfigMap":
-                api_client = KubernetesManager().get_core_api()
-                if namespace:
-                    resource["metadata"]["namespace"] = namespace
-                try:
-                    # Try to get the existing resource
-                    existing = api_client.read_namespaced_config_map(
-                        resource["metadata"]["name"],
-                        resource["metadata"]["namespace"]
-                    )
-                    # Update if exists
-                    response = api_client.replace_namespaced_config_map(
-                        resource["metadata"]["name"],
-                        resource["metadata"]["namespace"],
-                        resource
-                    )
-                    results.append(f"ConfigMap {resource['metadata']['name']} updated successfully")
-                except ApiException as e:
-                    if e.status == 404:
-                        # Create if doesn't exist
-                        response = api_client.create_namespaced_config_map(
-                            resource["metadata"]["namespace"],
-                            resource
-                        )
-                        results.append(f"ConfigMap {resource['metadata']['name']} created successfully")
-                    else:
-                        raise e
-            else:
-                results.append(f"Unsupported resource kind: {resource['kind']}")
-                
-        return "\n".join(results)
-    except Exception as e:
-        return f"Error applying YAML: {str(e)}" 
\ No newline at end of file
+            tasks.append(asyncio.create_task(apply_one(resource)))
+            # Let the request go out before parsing the next document
+            await asyncio.sleep(0)
+    except yaml.YAMLError as e:
+        parse_error = e
+    except asyncio.CancelledError:
+        for task in [*tasks, *existing.values()]:
+            task.cancel()
+        raise
+    
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    
+    results = []
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            results.append(f"Error applying YAML: {str(outcome)}")
+        else:
+            results.append(outcome)
+    if parse_error is not None:
+        results.append(f"Error applying YAML: {str(parse_error)}")
+    return "\n".join(results)